@@ -1,21 +1,20 @@
 import streamlit as st
 import pandas as pd
 
-def render_admin_page(conn, load_user_data_func):
+def render_admin_page(storage, user_repo):
     st.title("🛠️ 시스템 관리자 패널")
     st.markdown("---")
 
     # 1. 사용자 데이터 불러오기 (변수명: df_users)
     try:
-        df_users = load_user_data_func()
+        df_users = user_repo.to_dataframe()
     except Exception as e:
         st.error(f"사용자 데이터를 불러오는 중 오류 발생: {e}")
         df_users = pd.DataFrame()
 
-    # 2. 방문자 데이터 불러오기 (Visitors 시트)
+    # 2. 방문자 데이터 불러오기 (Visitors 테이블)
     try:
-        # ttl=0으로 최신 데이터 로드
-        df_visitors = conn.read(worksheet="Visitors", ttl=0)
+        df_visitors = storage.visitors.all()
 
         # 데이터가 있고 날짜 컬럼이 있는지 확인
         if not df_visitors.empty and 'date' in df_visitors.columns and 'count' in df_visitors.columns:
@@ -88,7 +87,8 @@ def render_admin_page(conn, load_user_data_func):
         if st.button("💾 변경사항 저장", key="save_admin_changes"):
             try:
                 with st.spinner("구글 시트 업데이트 중..."):
-                    conn.update(worksheet="Users", data=edited_df)
+                    # 사용자 저장소(메모리 색인)와 시트를 함께 갱신
+                    user_repo.replace_all(edited_df)
                     st.success("✅ 데이터가 성공적으로 저장되었습니다!")
                     # 1초 후 새로고침하여 변경사항 반영 확인
                     import time
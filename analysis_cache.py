@@ -0,0 +1,101 @@
+# analysis_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from feed_cache import CACHE_DIR
+
+ANALYSIS_DB_PATH = os.path.join(CACHE_DIR, "analysis.db")
+# 분석 결과 유효기간 (초) - 같은 기사는 하루 동안 재분석하지 않습니다.
+ANALYSIS_TTL = 24 * 60 * 60
+# 저장 한도: 개수와 전체 텍스트 크기(바이트)를 넘으면 가장 오래 사용되지 않은 결과부터 삭제(LRU)
+ANALYSIS_MAX_ENTRIES = 5000
+ANALYSIS_MAX_BYTES = 50 * 1024 * 1024
+
+
+def make_analysis_key(model, prompt_template, title, summary):
+    """(모델, 프롬프트 템플릿, 제목, 요약)의 해시 -> 같은 입력이면 항상 같은 키"""
+    raw = json.dumps([model, prompt_template, title or "", summary or ""], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Gemini 분석 결과를 저장하는 SQLite 캐시.
+    입력 내용의 해시를 키로 사용하므로 다른 사용자가 같은 기사를 분석해도 API를 다시 호출하지 않으며,
+    파일에 저장되어 리런/프로세스 재시작 후에도 유지됩니다.
+    """
+
+    def __init__(self, path=ANALYSIS_DB_PATH, ttl=ANALYSIS_TTL,
+                 max_entries=ANALYSIS_MAX_ENTRIES, max_bytes=ANALYSIS_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_access ON analysis (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result, created_at FROM analysis WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            result, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM analysis WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE analysis SET last_access = ? WHERE key = ?", (now, key))
+        return result
+
+    def put(self, key, result):
+        size = len(result.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis (key, result, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, result, size, now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM analysis WHERE created_at < ?", (now - self.ttl,))
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # 한도를 넘은 만큼 가장 오래 사용되지 않은 항목부터 삭제
+        for key, size in conn.execute("SELECT key, size FROM analysis ORDER BY last_access").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM analysis WHERE key = ?", (key,))
+            count -= 1
+            total -= size
@@ -1,16 +1,20 @@
 import streamlit as st
-import pandas as pd
+from streamlit.errors import StreamlitSecretNotFoundError
 from datetime import datetime, timedelta
-import time
-import secrets  # 보안 토큰 생성용
 from streamlit_gsheets import GSheetsConnection
-import bcrypt
 from dotenv import load_dotenv
 from admin_page import render_admin_page
 from qna_page import render_qna_page
 from mypage import render_mypage
 from notice_page import render_notice_manager
-import streamlit.components.v1 as components
+from user_repo import UserRepository
+from session_tokens import SessionTokenSigner, load_secret
+from visitor_counter import VisitorCounter
+from storage import create_storage, ConflictError
+from notice_cache import NoticeCache
+from write_behind import WriteBehindQueue
+from password_hasher import password_hasher, login_throttle, AuthBusyError
+from assets import begin_render, inject_css
 import os
 
 # [중요] 방금 만든 파일에서 함수 불러오기
@@ -28,26 +32,55 @@ st.set_page_config(
     }
 )
 
-def local_css(file_name):
-    with open(file_name, encoding="utf-8") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-local_css("style_global.css")
+# 스타일시트는 프로세스당 한 번 읽어 압축해 두고, 렌더마다 시트별로 한 번만 주입
+begin_render()
+inject_css("style_global.css")
 
 load_dotenv()
 
+def get_secret(name, default=None):
+    """secrets.toml이 없어도(로컬/테스트 실행) 기본값을 반환합니다."""
+    try:
+        return st.secrets.get(name, default)
+    except StreamlitSecretNotFoundError:
+        return default
+
 # --- 데이터 연결 --- #
-conn = st.connection("gsheets", type=GSheetsConnection)
+# STORAGE_BACKEND: "gsheets"(기본, 구글 시트) 또는 "sqlite"(로컬/오프라인/테스트용)
+@st.cache_resource
+def get_storage():
+    backend_name = os.environ.get("STORAGE_BACKEND") or get_secret("STORAGE_BACKEND", "gsheets")
+    return create_storage(backend_name, lambda: st.connection("gsheets", type=GSheetsConnection))
 
-@st.cache_data(ttl=2)
-def load_user_data():
-    try:
-        return conn.read(worksheet="Users", ttl=0)
-        if 'role' not in df.columns:
-            df['role'] = 'user'
-        return df
-    except:
-        return pd.DataFrame(columns=['username', 'hashed_password', 'openai_api_key', 'gemini_api_key', 'session_token', 'created_at'])
+storage = get_storage()
+
+# 공지사항 공유 캐시: 공지 관리 화면에서 쓸 때만 무효화되고, 그 사이에는 메모리에서 조회
+@st.cache_resource
+def get_notice_cache():
+    return NoticeCache(storage.notices)
+
+notice_cache = get_notice_cache()
+
+# 즉시 저장할 필요가 없는 행 수정(마지막 로그인 시각 등)을 모아서 백그라운드로 반영하는 대기열
+@st.cache_resource
+def get_write_queue():
+    return WriteBehindQueue()
+
+# 사용자 저장소: Users 테이블을 프로세스당 한 번 읽어 두고 아이디/토큰 색인으로 조회
+@st.cache_resource
+def get_user_repo():
+    return UserRepository(storage.users, write_queue=get_write_queue())
+
+user_repo = get_user_repo()
+user_repo.refresh_if_stale()
+
+# 자동 로그인용 서명 토큰 발급/검증기 (저장소 조회 없이 서명과 만료만 확인)
+@st.cache_resource
+def get_token_signer():
+    # secrets.toml이 없으면 load_secret이 환경변수 또는 로컬 비밀키 파일을 사용합니다.
+    return SessionTokenSigner(load_secret(get_secret("SESSION_SECRET")))
+
+token_signer = get_token_signer()
 
 # --- 세션 초기화 --- #
 if 'logged_in' not in st.session_state:
@@ -61,6 +94,10 @@ if 'logged_in' not in st.session_state:
 # ---------------------------------------------------------
 # [신규] 방문자 수 카운트 로직 (Visitors)
 # ---------------------------------------------------------
+@st.cache_resource
+def get_visitor_counter():
+    return VisitorCounter(storage.visitors)
+
 def track_daily_visitor():
     # [1] 세션 상태 확인 (가장 중요: 이 세션에서 이미 카운트했다면 즉시 종료)
     if st.session_state.get('visitor_counted') is True:
@@ -75,42 +112,10 @@ def track_daily_visitor():
     if st.session_state.get('is_admin', False):
         return
 
-    try:
-        # 오늘 날짜 (문자열)
-        today_date = datetime.now().strftime("%Y-%m-%d")
-
-        # --- 시트 데이터 읽기 및 업데이트 로직 ---
-        try:
-            df_visit = conn.read(worksheet="Visitors", ttl=0)
-        except:
-            df_visit = pd.DataFrame(columns=['date', 'count'])
-
-        if df_visit.empty or 'date' not in df_visit.columns:
-            df_visit = pd.DataFrame({'date': [today_date], 'count': [1]})
-        else:
-            # 날짜 컬럼 문자열 변환 (타입 불일치 방지)
-            df_visit['date'] = df_visit['date'].astype(str)
-
-            if today_date in df_visit['date'].values:
-                # 오늘 날짜 행 찾아서 +1
-                # (SettingWithCopyWarning 방지를 위해 인덱스 활용)
-                idx = df_visit.index[df_visit['date'] == today_date].tolist()[0]
-                current_cnt = int(df_visit.at[idx, 'count'])
-                df_visit.at[idx, 'count'] = current_cnt + 1
-            else:
-                # 새 날짜 추가
-                new_row = pd.DataFrame({'date': [today_date], 'count': [1]})
-                df_visit = pd.concat([df_visit, new_row], ignore_index=True)
-
-        conn.update(worksheet="Visitors", data=df_visit)
-
-        # [4] 카운트 완료 플래그 설정 (이게 있어야 새로고침 시 중복 안 됨)
-        st.session_state['visitor_counted'] = True
-
-    except Exception as e:
-        # 에러 발생 시에도 플래그는 True로 해서 무한 재시도 방지
-        st.session_state['visitor_counted'] = True
-        print(f"Visitor Tracking Error: {e}")
+    # [4] 메모리 카운터에만 더하고 바로 반환 (시트 반영은 백그라운드에서 모아서 처리)
+    get_visitor_counter().hit()
+    # 카운트 완료 플래그 설정 (이게 있어야 새로고침 시 중복 안 됨)
+    st.session_state['visitor_counted'] = True
 
 # ---------------------------------------------------------
 # [수정 핵심] URL 파라미터를 이용한 자동 로그인 로직
@@ -122,15 +127,22 @@ url_token = query_params.get("token")
 track_daily_visitor()
 
 if url_token and not st.session_state.logged_in:
-    df = load_user_data()
-    # 시트에서 해당 토큰을 가진 유저 검색
-    user_match = df[df['session_token'] == url_token]
+    # 서명된 토큰이면 서명/만료를 확인한 뒤 메모리 색인의 사용자 행과 대조 (시트 조회 없음)
+    claims = token_signer.verify(url_token)
+    if claims:
+        user = user_repo.get(claims['u'])
+        # 탈퇴했거나 발급 후 권한이 바뀐 계정(관리자 강등 등)의 토큰은 거부
+        if user and str(user.get('role')) != str(claims['r']):
+            user = None
+    else:
+        # 이전 방식(시트에 저장된 랜덤 토큰)으로 발급된 링크도 계속 동작하도록 토큰 색인에서 검색
+        user = user_repo.get_by_token(url_token)
 
-    if not user_match.empty:
-        user = user_match.iloc[0]
+    if user:
         st.session_state.update({
             'logged_in': True,
             'username': user['username'],
+            # 권한은 토큰이 아니라 현재 사용자 행 기준
             'is_admin': str(user.get('role')).lower() == 'admin',
             'user_keys': {'GEMINI': user.get('gemini_api_key'), 'OPENAI': user.get('openai_api_key')}
         })
@@ -146,22 +158,42 @@ with st.sidebar:
                 uid = st.text_input("아이디")
                 upw = st.text_input("비밀번호", type="password")
                 if st.form_submit_button("로그인"):
-                    df = load_user_data()
-                    if uid in df['username'].values:
-                        user = df[df['username'] == uid].iloc[0]
-                        if bcrypt.checkpw(upw.encode('utf-8'), str(user['hashed_password']).encode('utf-8')):
-                            # 1. 고유 세션 토큰 생성 (보안 강화)
-                            new_token = secrets.token_urlsafe(32)
+                    user = user_repo.get(uid)
+                    if user:
+                        # 같은 계정으로 검증 중이거나 연속으로 틀려 잠긴 경우 bcrypt를 실행하지 않음
+                        ok, new_hash = None, None
+                        wait = login_throttle.acquire(uid)
+                        if wait:
+                            st.error(f"로그인 시도가 너무 많습니다. {wait}초 후 다시 시도해주세요.")
+                        else:
+                            try:
+                                # bcrypt 검증은 해시 작업 풀에서 실행 (작업 계수가 바뀌었으면 새 해시도 함께 받음)
+                                ok, new_hash = password_hasher.verify(upw, user['hashed_password'])
+                            except AuthBusyError as e:
+                                st.error(str(e))
+                            finally:
+                                login_throttle.release(uid, success=ok)
+                        if ok:
+                            # 1. 서명된 세션 토큰 생성 (아이디/권한/만료시각 포함, 시트에 저장하지 않음)
+                            new_token = token_signer.issue(uid, str(user.get('role')))
 
                             # 2. [핵심 수정] 한국 시간(KST) 계산
                             # 서버 시간(UTC)에 9시간을 더해 한국 시간으로 맞춥니다.
                             kst_now = datetime.now() + timedelta(hours=9)
                             kst_now_str = kst_now.strftime("%Y-%m-%d %H:%M:%S")
 
-                            # 2. [DB 업데이트] 토큰과 마지막 로그인 시간 저장
-                            df.loc[df['username'] == uid, 'session_token'] = new_token
-                            df.loc[df['username'] == uid, 'last_login'] = kst_now_str
-                            conn.update(worksheet="Users", data=df)
+                            # 2. [DB 업데이트] 마지막 로그인 시간 저장 (메모리 갱신 후 시트 반영은 백그라운드)
+                            # 이전 방식 토큰이 남아 있으면 함께 지워 예전 자동 로그인 링크를 무효화합니다.
+                            deferred = {'last_login': kst_now_str}
+                            if user.get('session_token'):
+                                deferred['session_token'] = ""
+                            user_repo.update_deferred(uid, **deferred)
+                            # 작업 계수가 바뀌어 새로 만든 해시는 바로 저장 (실패해도 다음 로그인 때 다시 시도)
+                            if new_hash:
+                                try:
+                                    user_repo.update(uid, hashed_password=new_hash)
+                                except Exception as e:
+                                    print(f"⚠️ 비밀번호 해시 갱신 실패: {e}")
 
                             # 3. 세션 업데이트
                             st.session_state.update({
@@ -175,7 +207,7 @@ with st.sidebar:
                             st.query_params.token = new_token
                             st.success("로그인 성공!")
                             st.rerun()
-                        else: st.error("비밀번호 불일치")
+                        elif ok is False: st.error("비밀번호 불일치")
                     else: st.error("아이디 없음")
         else:
             with st.form("signup"):
@@ -184,21 +216,28 @@ with st.sidebar:
                 nge = st.text_input("Gemini API Key (선택)")
                 noa = st.text_input("GPT API Key (선택)")
                 if st.form_submit_button("가입하기"):
-                    df = load_user_data()
-                    if nid in df['username'].values: st.error("중복 아이디 입니다.")
+                    if user_repo.exists(nid): st.error("중복 아이디 입니다.")
                     else:
-                        hashed = bcrypt.hashpw(npw.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-                        new_row = pd.DataFrame([{
-                            "username": nid,
-                            "hashed_password": hashed,
-                            "gemini_api_key": nge,
-                            "openai_api_key": noa,
-                            "session_token": "", # 초기 토큰은 비어있음
-                            "created_at": datetime.now().isoformat(),
-                            "role": "user"
-                        }])
-                        conn.update(worksheet="Users", data=pd.concat([df, new_row], ignore_index=True))
-                        st.success("가입 완료!")
+                        try:
+                            # bcrypt 해시는 해시 작업 풀에서 실행
+                            hashed = password_hasher.hash(npw)
+                        except AuthBusyError as e:
+                            st.error(str(e))
+                        else:
+                            try:
+                                user_repo.add({
+                                    "username": nid,
+                                    "hashed_password": hashed,
+                                    "gemini_api_key": nge,
+                                    "openai_api_key": noa,
+                                    "session_token": "", # 초기 토큰은 비어있음
+                                    "created_at": datetime.now().isoformat(),
+                                    "role": "user"
+                                })
+                                st.success("가입 완료!")
+                            except ConflictError:
+                                # 해시를 만드는 사이 같은 아이디로 먼저 가입한 경우
+                                st.error("중복 아이디 입니다.")
     else:
         st.success(f"반가워요, {st.session_state.username}님!")
 
@@ -210,10 +249,17 @@ with st.sidebar:
         selected_page = st.radio("이동", main_menu)
 
         if st.button("로그아웃"):
-            # 로그아웃 시 시트의 토큰 무효화 (보안)
-            df = load_user_data()
-            df.loc[df['username'] == st.session_state.username, 'session_token'] = ""
-            conn.update(worksheet="Users", data=df)
+            # 로그아웃 시 토큰 무효화 (보안): 서명 토큰은 폐기 목록에 등록
+            current_token = st.query_params.get("token")
+            if current_token:
+                token_signer.revoke(current_token)
+            # 이전 방식 토큰이 시트에 남아 있으면 함께 삭제 (보안 관련 쓰기이므로 지연 없이 바로 반영)
+            user = user_repo.get(st.session_state.username)
+            if user and user.get('session_token'):
+                try:
+                    user_repo.update(st.session_state.username, session_token="")
+                except Exception as e:
+                    print(f"⚠️ 로그아웃 토큰 삭제 실패: {e}")
 
             # 세션 및 URL 파라미터 초기화
             st.session_state.update({'logged_in': False, 'username': None, 'user_keys': {'GEMINI': None, 'OPENAI': None}})
@@ -225,11 +271,9 @@ if st.session_state.logged_in:
     if selected_page == "뉴스 대시보드":
         # --- [추가] 최상단 공지사항 노출 로직 ---
         try:
-            # Notice 워크시트에서 데이터 로드 (가장 최신 것이 첫 번째로 오게 정렬됨)
-            notice_df = conn.read(worksheet="Notice", ttl=0)
-            if not notice_df.empty:
-                # 최신순으로 정렬 후 첫 번째 행 가져오기
-                latest_notice = notice_df.sort_values(by="created_at", ascending=False).iloc[0]
+            # 공유 캐시에서 최신 공지 한 건 조회 (시트 I/O 없음)
+            latest_notice = notice_cache.get().latest
+            if latest_notice:
 
                 # 메인 컨텐츠 최상단에 강조된 박스로 표시
                 st.info(f"📢 **최신 공지**: {latest_notice['title']} ({latest_notice['created_at']})")
@@ -241,13 +285,13 @@ if st.session_state.logged_in:
             pass
         render_news_section()
     elif selected_page == "1:1 질문":
-        render_qna_page(conn) # QnA 페이지 호출
+        render_qna_page(storage, notice_cache) # QnA 페이지 호출
     elif selected_page == "마이페이지":
-        render_mypage(conn)
+        render_mypage(user_repo)
     elif selected_page == "📢 공지사항 관리": # 새로 만든 페이지 연결
-        render_notice_manager(conn)
+        render_notice_manager(notice_cache)
     elif selected_page == "🛠️ 어드민 설정":
-        render_admin_page(conn, load_user_data)
+        render_admin_page(storage, user_repo)
 else:
     # 비로그인 시 기본 화면
     render_news_section()
\ No newline at end of file
@@ -0,0 +1,62 @@
+# assets.py
+import hashlib
+import re
+import threading
+import streamlit as st
+
+# 이번 렌더에서 이미 넣은 스타일시트 (session_state 키)
+INJECTED_KEY = "_injected_css"
+
+_lock = threading.Lock()
+_stylesheets = {}  # {파일 이름: Stylesheet}
+
+
+def minify_css(text):
+    """주석과 불필요한 공백을 제거합니다. (선택자 의미가 바뀌지 않는 범위에서만)"""
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};,])\s*", r"\1", text)
+    return text.replace(";}", "}").strip()
+
+
+class Stylesheet:
+    """한 번 읽어 압축해 둔 CSS와 내용 해시"""
+
+    def __init__(self, name, css):
+        self.name = name
+        self.css = css
+        self.digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def html(self):
+        return f'<style data-asset="{self.name}-{self.digest}">{self.css}</style>'
+
+
+def get_stylesheet(file_name):
+    """프로세스당 한 번만 파일을 읽고 압축합니다. 파일이 없으면 None"""
+    with _lock:
+        if file_name not in _stylesheets:
+            try:
+                with open(file_name, encoding="utf-8") as f:
+                    _stylesheets[file_name] = Stylesheet(file_name, minify_css(f.read()))
+            except FileNotFoundError:
+                return None
+        return _stylesheets[file_name]
+
+
+def begin_render():
+    """스크립트 실행(리런)마다 맨 앞에서 한 번 호출해 이번 렌더의 주입 기록을 비웁니다."""
+    st.session_state[INJECTED_KEY] = set()
+
+
+def inject_css(file_name):
+    """스타일시트를 이번 렌더에 아직 넣지 않았을 때만 넣습니다. (같은 렌더에서 여러 번 호출해도 한 번)"""
+    sheet = get_stylesheet(file_name)
+    if sheet is None:
+        st.error(f"CSS 파일을 찾을 수 없습니다: {file_name}")
+        return
+    injected = st.session_state.setdefault(INJECTED_KEY, set())
+    if sheet.digest in injected:
+        return
+    injected.add(sheet.digest)
+    st.markdown(sheet.html, unsafe_allow_html=True)
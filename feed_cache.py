@@ -0,0 +1,73 @@
+# feed_cache.py
+import json
+import os
+import threading
+import time
+
+# 캐시 파일을 저장할 로컬 디렉토리 (환경변수로 변경 가능)
+CACHE_DIR = os.environ.get("NEWS_CACHE_DIR", ".cache")
+FEED_CACHE_PATH = os.path.join(CACHE_DIR, "feed_cache.json")
+
+
+class FeedCache:
+    """
+    RSS URL별로 검증값(ETag / Last-Modified)과 마지막으로 파싱한 기사 목록을 보관합니다.
+    조건부 요청(If-None-Match / If-Modified-Since)에 304가 오면 저장된 기사를 그대로 재사용하고,
+    내용은 JSON 파일로 저장되어 프로세스가 재시작되어도 유지됩니다.
+    """
+
+    def __init__(self, path=FEED_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"⚠️ 피드 캐시 로드 실패 (새로 시작): {e}")
+            return {}
+
+    def _save(self):
+        # 임시 파일에 먼저 쓰고 교체하여, 저장 도중 중단되어도 캐시 파일이 깨지지 않도록 합니다.
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, url):
+        with self._lock:
+            return self._data.get(url)
+
+    def conditional_headers(self, url):
+        """저장된 검증값으로 조건부 요청 헤더를 만듭니다."""
+        cached = self.get(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("modified"):
+                headers["If-Modified-Since"] = cached["modified"]
+        return headers
+
+    def put(self, url, etag, modified, entries):
+        with self._lock:
+            self._data[url] = {
+                "etag": etag,
+                "modified": modified,
+                "entries": entries,
+                "fetched_at": time.time()
+            }
+            try:
+                self._save()
+            except Exception as e:
+                print(f"⚠️ 피드 캐시 저장 실패: {e}")
+
+
+# 프로세스 전체에서 공유하는 캐시 인스턴스
+feed_cache = FeedCache()
@@ -0,0 +1,70 @@
+# gemini_client.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from google import genai
+
+# 동시에 보관할 최대 클라이언트 수 (API 키 개수 기준)
+CLIENT_POOL_MAX = 64
+# 이 시간(초) 동안 사용되지 않은 클라이언트는 정리합니다.
+CLIENT_IDLE_TIMEOUT = 30 * 60
+# 요청 하나의 HTTP 타임아웃(초). 응답이 없는 호출이 스케줄러 작업 스레드를 계속 붙잡지 않게 합니다.
+GEMINI_HTTP_TIMEOUT = 90
+
+
+def hash_api_key(api_key):
+    """API 키 원문 대신 로그/딕셔너리 키에 사용할 해시값"""
+    return hashlib.sha256(api_key.strip().encode("utf-8")).hexdigest()[:16]
+
+
+class GeminiClientPool:
+    """
+    API 키별 genai.Client를 재사용하는 풀.
+    매 클릭마다 클라이언트를 새로 만들면 HTTP 커넥션/TLS 세션이 버려지므로,
+    키별로 하나를 만들어 두고 여러 리런/사용자가 공유합니다. (키 원문은 저장/출력하지 않음)
+    """
+
+    def __init__(self, max_size=CLIENT_POOL_MAX, idle_timeout=CLIENT_IDLE_TIMEOUT):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # {key_hash: [client, last_used]} - 사용 순서대로 정렬 (LRU)
+        self._clients = OrderedDict()
+
+    def get(self, api_key):
+        key_hash = hash_api_key(api_key)
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            item = self._clients.get(key_hash)
+            if item is not None:
+                item[1] = now
+                self._clients.move_to_end(key_hash)
+                return item[0]
+
+            client = genai.Client(api_key=api_key.strip(), http_options={"timeout": GEMINI_HTTP_TIMEOUT * 1000})
+            self._clients[key_hash] = [client, now]
+            while len(self._clients) > self.max_size:
+                _, (old_client, _) = self._clients.popitem(last=False)
+                self._close(old_client)
+            print(f"✅ Gemini 클라이언트 생성 (key={key_hash}, pool={len(self._clients)})")
+            return client
+
+    def _evict_idle(self, now):
+        expired = [k for k, (_, last_used) in self._clients.items() if now - last_used > self.idle_timeout]
+        for key_hash in expired:
+            self._close(self._clients.pop(key_hash)[0])
+
+    @staticmethod
+    def _close(client):
+        try:
+            close = getattr(client, "close", None)
+            if close:
+                close()
+        except Exception as e:
+            print(f"⚠️ Gemini 클라이언트 정리 실패: {e}")
+
+
+# 프로세스 전체에서 공유하는 클라이언트 풀
+client_pool = GeminiClientPool()
@@ -0,0 +1,301 @@
+# gemini_scheduler.py
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import requests
+from gemini_client import hash_api_key
+
+try:
+    import httpx
+    _TRANSPORT_ERRORS = (ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout, httpx.TransportError)
+except ImportError:
+    _TRANSPORT_ERRORS = (ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout)
+
+# API 키별 호출 한도 (토큰 버킷): 분당 호출 수와 순간 최대 호출 수
+RATE_PER_MINUTE = 15
+RATE_BURST = 5
+# 대기열에 쌓아둘 수 있는 최대 요청 수 (넘으면 즉시 실패 처리)
+QUEUE_MAX = 100
+# 실제로 모델을 호출하는 작업 스레드 수 (첫 요청 때 시작)
+SCHEDULER_WORKERS = 4
+# 재시도 설정 (429 / 5xx / 네트워크 오류): 지수 백오프 + 지터
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 20.0
+# 스크립트 스레드가 결과를 기다리는 최대 시간(초): 일반 호출은 전체, 스트리밍은 조각 사이 간격
+CALL_TIMEOUT = 120
+STREAM_IDLE_TIMEOUT = 60
+
+_STREAM_END = object()
+
+
+class SchedulerBusyError(Exception):
+    pass
+
+
+class SchedulerTimeoutError(Exception):
+    pass
+
+
+class _StreamCancelled(Exception):
+    """스트림을 읽던 쪽이 떠나서 작업 스레드가 호출을 멈출 때"""
+    pass
+
+
+def is_retryable(error):
+    """429(요청 과다) / 5xx(서버 오류) / 네트워크 오류(httpx, requests 포함)만 재시도합니다."""
+    while error is not None:
+        code = getattr(error, "code", None) or getattr(error, "status_code", None)
+        if isinstance(code, int):
+            return code == 429 or code >= 500
+        if isinstance(error, _TRANSPORT_ERRORS):
+            return True
+        # SDK가 전송 오류를 감싸서 다시 던진 경우 원래 오류로 판단합니다.
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def backoff_delay(attempt):
+    """attempt번째 재시도 전 대기 시간 (full jitter)"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute=RATE_PER_MINUTE, capacity=RATE_BURST):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def try_acquire(self):
+        """토큰을 얻으면 0, 아니면 다음 토큰까지 기다려야 할 시간(초)을 반환합니다."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self, now):
+        """오래 쉬어서 다시 가득 찬 버킷인지 (새로 만든 버킷과 같음)"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class GeminiScheduler:
+    """
+    Gemini 호출 앞단의 스케줄러. 일반 호출과 스트리밍 호출 모두 같은 대기열을 거칩니다.
+    - API 키별 토큰 버킷으로 호출 속도 제한
+    - 키별 대기열을 번갈아 처리(라운드 로빈)하여 한 사용자가 대기열을 독점하지 못하게 함
+    - 재시도 가능한 오류는 지터를 넣은 지수 백오프로 재시도
+    - 같은 요청(dedupe_key)이 처리 중이면 새로 호출하지 않고 그 결과를 함께 사용
+      (다른 키로 시작된 호출의 오류나 중단된 스트림은 물려받지 않고 자기 키로 다시 요청)
+    - 스크립트 스레드는 최대 timeout초만 기다리고 SchedulerTimeoutError로 빠져나옴
+    """
+
+    def __init__(self, workers=SCHEDULER_WORKERS, queue_max=QUEUE_MAX):
+        self.workers = workers
+        self.queue_max = queue_max
+        self._cond = threading.Condition()
+        # {key_hash: deque[(dedupe_key, fn, future, can_retry)]}
+        self._queues = OrderedDict()
+        self._queued = 0
+        self._buckets = {}
+        # {dedupe_key: (future, 호출한 키의 key_hash)}
+        self._inflight = {}
+        self._started = False
+
+    def _ensure_workers(self):
+        """작업 스레드는 import 시점이 아니라 첫 요청 때 시작합니다. (self._cond 보유 상태에서 호출)"""
+        if self._started:
+            return
+        self._started = True
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"gemini-scheduler-{i}", daemon=True).start()
+
+    def _bucket(self, key_hash):
+        bucket = self._buckets.get(key_hash)
+        if bucket is None:
+            self._prune_buckets()
+            bucket = self._buckets[key_hash] = TokenBucket()
+        return bucket
+
+    def _prune_buckets(self):
+        """
+        다시 가득 찬 버킷은 새 버킷과 같으므로, 대기 중인 요청이 없는 키의 버킷은 지웁니다.
+        (사용자 키마다 버킷이 쌓이지 않도록 새 키가 들어올 때 정리)
+        """
+        now = time.monotonic()
+        idle = [key_hash for key_hash, bucket in self._buckets.items()
+                if key_hash not in self._queues and bucket.is_full(now)]
+        for key_hash in idle:
+            del self._buckets[key_hash]
+
+    def _finish(self, dedupe_key, future, result=None, error=None):
+        with self._cond:
+            self._inflight.pop(dedupe_key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _enqueue(self, api_key, dedupe_key, fn, can_retry=None):
+        """
+        fn()을 대기열에 넣습니다. 같은 요청이 처리 중이면 그 Future를 돌려줍니다.
+        반환: (Future, 새로 넣었는지 여부, 그 호출을 시작한 키의 key_hash)
+        """
+        key_hash = hash_api_key(api_key)
+        with self._cond:
+            if dedupe_key in self._inflight:
+                future, leader_hash = self._inflight[dedupe_key]
+                return future, False, leader_hash
+            if self._queued >= self.queue_max:
+                raise SchedulerBusyError("요청이 많아 잠시 후 다시 시도해주세요.")
+            self._ensure_workers()
+            future = Future()
+            self._inflight[dedupe_key] = (future, key_hash)
+            self._queues.setdefault(key_hash, deque()).append((dedupe_key, fn, future, can_retry))
+            self._queued += 1
+            self._cond.notify()
+        return future, True, key_hash
+
+    def submit(self, api_key, dedupe_key, fn):
+        """fn()을 대기열에 넣고 Future를 반환합니다."""
+        return self._enqueue(api_key, dedupe_key, fn)[0]
+
+    @staticmethod
+    def _inherits(error, key_hash, leader_hash):
+        """
+        함께 기다린 호출의 오류를 그대로 받을지 여부.
+        다른 키로 시작된 호출의 오류(호출 한도 초과, 잘못된 키 등)와 읽는 쪽이 떠나 중단된 스트림은
+        이 요청과 무관하므로 받지 않고 자기 키로 다시 요청합니다.
+        """
+        return leader_hash == key_hash and not isinstance(error, _StreamCancelled)
+
+    @staticmethod
+    def _wait(future, timeout):
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if future.done():
+                raise
+            raise SchedulerTimeoutError(f"응답이 {timeout}초 안에 오지 않았습니다. 잠시 후 다시 시도해주세요.")
+
+    def call(self, api_key, dedupe_key, fn, timeout=CALL_TIMEOUT):
+        key_hash = hash_api_key(api_key)
+        future, _, leader_hash = self._enqueue(api_key, dedupe_key, fn)
+        try:
+            return self._wait(future, timeout)
+        except SchedulerTimeoutError:
+            raise
+        except Exception as e:
+            if self._inherits(e, key_hash, leader_hash):
+                raise
+        # 키를 포함한 dedupe_key로 다시 요청하므로 같은 키의 호출끼리만 결과를 함께 씁니다.
+        return self._wait(self._enqueue(api_key, (key_hash, dedupe_key), fn)[0], timeout)
+
+    def _next_job(self):
+        """호출 한도가 남은 키 중 차례가 된 키의 요청을 꺼냅니다. (self._cond 보유 상태에서 호출)"""
+        while True:
+            wait = None
+            for key_hash in list(self._queues):
+                jobs = self._queues[key_hash]
+                delay = self._bucket(key_hash).try_acquire()
+                if delay == 0:
+                    job = jobs.popleft()
+                    self._queued -= 1
+                    # 처리한 키는 맨 뒤로 보내 다음 키에게 차례를 넘깁니다.
+                    del self._queues[key_hash]
+                    if jobs:
+                        self._queues[key_hash] = jobs
+                    return job
+                wait = delay if wait is None else min(wait, delay)
+            self._cond.wait(timeout=wait)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                dedupe_key, fn, future, can_retry = self._next_job()
+            try:
+                result = self._run_with_retry(fn, can_retry)
+            except Exception as e:
+                self._finish(dedupe_key, future, error=e)
+            else:
+                self._finish(dedupe_key, future, result=result)
+
+    def _run_with_retry(self, fn, can_retry=None):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return fn()
+            except Exception as e:
+                if attempt == MAX_RETRIES or not is_retryable(e) or (can_retry and not can_retry()):
+                    raise
+                delay = backoff_delay(attempt)
+                print(f"⚠️ Gemini 호출 재시도 {attempt + 1}/{MAX_RETRIES} ({delay:.1f}s 후): {e}")
+                time.sleep(delay)
+
+    def stream(self, api_key, dedupe_key, make_stream, timeout=STREAM_IDLE_TIMEOUT):
+        """
+        스트리밍 호출용. 작업 스레드가 대기열 순서대로 스트림을 열고, 받은 조각을 이 제너레이터로 넘깁니다.
+        재시도는 첫 조각을 받기 전까지만 합니다. (중복 출력 방지)
+        같은 요청이 이미 처리 중이면 그 호출이 끝날 때까지 기다렸다가 완성된 텍스트를 한 번에 yield 합니다.
+        그 호출이 중단되었거나 다른 키의 오류로 끝났다면 자기 키로 다시 요청합니다.
+        timeout초 동안 다음 조각이 오지 않으면 SchedulerTimeoutError를 발생시킵니다.
+        """
+        key_hash = hash_api_key(api_key)
+        chunks = queue.Queue()
+        cancelled = threading.Event()
+        sent = []
+
+        def run():
+            # 차례를 기다리는 동안 읽는 쪽이 떠났다면 호출하지 않습니다.
+            if cancelled.is_set():
+                raise _StreamCancelled()
+            parts = []
+            for chunk in make_stream():
+                if cancelled.is_set():
+                    raise _StreamCancelled()
+                parts.append(chunk)
+                sent.append(True)
+                chunks.put(chunk)
+            return "".join(parts)
+
+        while True:
+            future, is_leader, leader_hash = self._enqueue(api_key, dedupe_key, run, can_retry=lambda: not sent)
+            if is_leader:
+                break
+            try:
+                text = self._wait(future, CALL_TIMEOUT)
+            except SchedulerTimeoutError:
+                raise
+            except Exception as e:
+                if self._inherits(e, key_hash, leader_hash):
+                    raise
+                # 다시 요청할 때는 키를 포함한 dedupe_key를 사용해 같은 키의 호출끼리만 기다립니다.
+                if leader_hash != key_hash:
+                    dedupe_key = (key_hash, dedupe_key)
+                continue
+            yield text
+            return
+
+        future.add_done_callback(lambda _: chunks.put(_STREAM_END))
+        try:
+            while True:
+                try:
+                    chunk = chunks.get(timeout=timeout)
+                except queue.Empty:
+                    raise SchedulerTimeoutError(f"응답이 {timeout}초 동안 없습니다. 잠시 후 다시 시도해주세요.")
+                if chunk is _STREAM_END:
+                    future.result()  # 스트림이 오류로 끝났다면 여기서 다시 발생
+                    return
+                yield chunk
+        finally:
+            # 화면을 떠났거나 시간 초과로 읽기를 멈추면 작업 스레드도 다음 조각에서 멈춥니다.
+            cancelled.set()
+
+
+# 프로세스 전체에서 공유하는 스케줄러
+scheduler = GeminiScheduler()
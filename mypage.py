@@ -1,19 +1,9 @@
 import streamlit as st
-import pandas as pd
-from streamlit_gsheets import GSheetsConnection
-import bcrypt
-import os
-
-# --- CSS 파일을 불러오는 함수 ---
-def local_css(file_name):
-    if os.path.exists(file_name):
-        with open(file_name, encoding="utf-8") as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    else:
-        st.error(f"CSS 파일을 찾을 수 없습니다: {file_name}")
-
-def render_mypage(conn):
-    local_css("mypage.css") # 외부 파일 로드
+from password_hasher import password_hasher
+from assets import inject_css
+
+def render_mypage(user_repo):
+    inject_css("mypage.css") # 외부 파일 로드 (압축본, 렌더당 한 번)
 
     # --- 로그인 체크 ---
     if 'logged_in' not in st.session_state or not st.session_state.logged_in:
@@ -22,18 +12,15 @@ def render_mypage(conn):
 
     def update_info(field, value):
         try:
-            df = conn.read(worksheet="Users")
-            idx = df.index[df['username'] == st.session_state.username].tolist()[0]
+            username = st.session_state.username
             if field == 'password':
-                df.at[idx, 'hashed_password'] = bcrypt.hashpw(value.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                user_repo.update(username, hashed_password=password_hasher.hash(value))
             elif field == 'gemini':
-                df.at[idx, 'gemini_api_key'] = value
+                user_repo.update(username, gemini_api_key=value)
                 st.session_state.user_keys['GEMINI'] = value
             elif field == 'gpt':
-                df.at[idx, 'openai_api_key'] = value
+                user_repo.update(username, openai_api_key=value)
                 st.session_state.user_keys['OPENAI'] = value
-            conn.update(worksheet="Users", data=df)
-            st.cache_data.clear()
             return True
         except Exception as e:
             st.error(f"오류 발생: {e}")
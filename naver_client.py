@@ -0,0 +1,147 @@
+# naver_client.py
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+NAVER_NEWS_URL = "https://openapi.naver.com/v1/search/news.json"
+# (연결 타임아웃, 읽기 타임아웃) 초
+NAVER_TIMEOUT = (3, 5)
+# 같은 (검색어, 정렬, 페이지) 결과를 공유하는 시간(초)과 최대 보관 개수
+NAVER_CACHE_TTL = 5 * 60
+NAVER_CACHE_MAX = 500
+# 네이버 검색 API 제한: display 최대 100, start 최대 1000, 하루 25,000회
+NAVER_DISPLAY_MAX = 100
+NAVER_START_MAX = 1000
+NAVER_DAILY_LIMIT = 25000
+
+KST = timezone(timedelta(hours=9))
+_TAG_RE = re.compile('<[^<]+?>')
+
+
+class NaverQuotaExceeded(Exception):
+    pass
+
+
+class _QuotaRetry(Retry):
+    """자동 재시도도 네이버 호출 한 번이므로, 재시도하기 전에 일일 한도를 차감합니다."""
+
+    def __init__(self, *args, take_quota=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.take_quota = take_quota
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.take_quota = self.take_quota
+        return retry
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)  # 재시도 횟수를 다 쓰면 여기서 예외
+        if self.take_quota:
+            self.take_quota()
+        return retry
+
+
+class _QuotaAdapter(HTTPAdapter):
+    """실제로 전송하는 요청마다 일일 한도를 차감하는 어댑터 (캐시에서 돌려준 결과는 차감하지 않음)"""
+
+    def __init__(self, take_quota, **kwargs):
+        self.take_quota = take_quota
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.take_quota()
+        return super().send(request, **kwargs)
+
+
+class NaverNewsClient:
+    """
+    네이버 뉴스 검색 API 클라이언트.
+    - requests.Session 커넥션 풀 재사용 (매 검색마다 TCP/TLS 연결을 새로 맺지 않음)
+    - (검색어, 정렬, 페이지) 단위 TTL 캐시를 모든 사용자가 공유
+    - start 기반 페이지 이동 (API 최대 범위까지)
+    - 재시도를 포함해 실제로 보낸 요청 수를 하루 단위로 세어, 한도에 도달하면 호출하지 않음
+    """
+
+    def __init__(self, client_id, client_secret, daily_limit=NAVER_DAILY_LIMIT,
+                 cache_ttl=NAVER_CACHE_TTL, cache_max=NAVER_CACHE_MAX):
+        self.daily_limit = daily_limit
+        self.cache_ttl = cache_ttl
+        self.cache_max = cache_max
+        self.session = requests.Session()
+        self.session.headers.update({"X-Naver-Client-Id": client_id, "X-Naver-Client-Secret": client_secret})
+        retry = _QuotaRetry(
+            total=2, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504], allowed_methods=["GET"],
+            take_quota=self._take_quota
+        )
+        self.session.mount("https://", _QuotaAdapter(
+            self._take_quota, pool_connections=4, pool_maxsize=16, max_retries=retry
+        ))
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._quota_day = None
+        self._quota_used = 0
+
+    def quota_remaining(self):
+        with self._lock:
+            self._reset_quota_if_new_day()
+            return self.daily_limit - self._quota_used
+
+    def _reset_quota_if_new_day(self):
+        # 네이버 일일 한도는 한국 시간 자정 기준으로 초기화됩니다.
+        today = datetime.now(KST).date()
+        if self._quota_day != today:
+            self._quota_day = today
+            self._quota_used = 0
+
+    def _take_quota(self):
+        with self._lock:
+            self._reset_quota_if_new_day()
+            if self._quota_used >= self.daily_limit:
+                raise NaverQuotaExceeded("네이버 검색 API 일일 호출 한도에 도달했습니다.")
+            self._quota_used += 1
+
+    def search(self, query, sort="date", page=1, display=15):
+        """
+        반환: (기사 dict 리스트, 전체 결과 수)
+        page는 1부터 시작하며, API가 허용하는 범위를 넘으면 빈 결과를 반환합니다.
+        """
+        display = max(1, min(display, NAVER_DISPLAY_MAX))
+        start = (max(page, 1) - 1) * display + 1
+        if start > NAVER_START_MAX:
+            return [], 0
+
+        key = (query, sort, start, display)
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > now:
+                self._cache.move_to_end(key)
+                return cached[1], cached[2]
+
+        params = {"query": query, "display": display, "start": start, "sort": sort}
+        res = self.session.get(NAVER_NEWS_URL, params=params, timeout=NAVER_TIMEOUT)
+        res.raise_for_status()
+        body = res.json()
+        items = [
+            {
+                'title': _TAG_RE.sub('', item['title']),
+                'link': item['link'],
+                # 발행일은 원문 그대로 두고, 호출하는 쪽에서 열 단위로 한 번에 변환합니다.
+                'published': item['pubDate'],
+                'summary': _TAG_RE.sub('', item['description'])
+            }
+            for item in body.get('items', [])
+        ]
+        total = min(body.get('total', 0), NAVER_START_MAX + display - 1)
+
+        with self._lock:
+            self._cache[key] = (now + self.cache_ttl, items, total)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max:
+                self._cache.popitem(last=False)
+        return items, total
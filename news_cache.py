@@ -0,0 +1,87 @@
+# news_cache.py
+import threading
+import time
+from rss_collector import SOURCES
+
+# 같은 언론사의 새로고침은 이 간격(초) 안에 한 번만 실제 수집으로 이어집니다.
+REFRESH_MIN_INTERVAL = 30
+
+
+class SourceNewsCache:
+    """
+    (market, source) 단위의 뉴스 조회 캐시. source가 None이면 시장 전체(스토리별 대표 기사) 목록입니다.
+    새로고침은 해당 언론사의 캐시와 그로부터 만든 조회 결과(및 시장 전체 목록)만 무효화하며,
+    여러 사용자가 동시에 새로고침해도 언론사당 REFRESH_MIN_INTERVAL마다 최대 한 번만 수집합니다.
+    """
+
+    def __init__(self, store, ingestor, refresh_interval=REFRESH_MIN_INTERVAL):
+        self.store = store
+        self.ingestor = ingestor
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        # {(market, source): {view_key: DataFrame}}
+        self._views = {}
+        self._last_refresh = {}
+        # 무효화될 때마다 증가 -> 읽는 도중 무효화된 결과는 캐시에 넣지 않습니다.
+        self._generation = {}
+        # 백그라운드 수집으로 새 기사가 저장되면 해당 언론사만 무효화
+        ingestor.add_listener(self.invalidate)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, market, source, limit=10):
+        key = (market, source)
+        with self._lock:
+            cached = self._views.get(key, {}).get(limit)
+        if cached is not None:
+            return cached
+
+        with self._key_lock(key):
+            # 락을 기다리는 동안 다른 세션이 이미 채웠을 수 있음
+            with self._lock:
+                cached = self._views.get(key, {}).get(limit)
+            if cached is not None:
+                return cached
+
+            # 아직 한 번도 수집되지 않은 언론사(시장)만 즉시 수집합니다.
+            if not self.store.has_articles(market, source):
+                if source is None:
+                    self.ingestor.ingest_market(market)
+                else:
+                    self.ingestor.ingest_source(market, source)
+            with self._lock:
+                generation = self._generation.get(key, 0)
+            # 시장 전체 목록은 등록된 언론사의 기사만 스토리별로 묶어 보여줍니다.
+            sources = list(SOURCES.get(market, {})) if source is None else None
+            df = self.store.read_articles(market, source, limit=limit, sources=sources)
+            with self._lock:
+                if self._generation.get(key, 0) == generation:
+                    self._views.setdefault(key, {})[limit] = df
+            return df
+
+    def invalidate(self, market, source):
+        # 언론사 기사가 바뀌면 그 기사가 포함된 시장 전체 목록도 함께 무효화합니다.
+        with self._lock:
+            for key in {(market, source), (market, None)}:
+                self._views.pop(key, None)
+                self._generation[key] = self._generation.get(key, 0) + 1
+
+    def refresh(self, market, source):
+        """
+        언론사 하나를 다시 수집하고 해당 캐시만 무효화합니다.
+        최근에 이미 새로고침되었다면 수집을 건너뛰고 False를 반환합니다.
+        """
+        key = (market, source)
+        with self._key_lock(key):
+            if time.time() - self._last_refresh.get(key, 0) < self.refresh_interval:
+                return False
+            if source is None:
+                self.ingestor.ingest_market(market)
+            else:
+                self.ingestor.ingest_source(market, source)
+            self._last_refresh[key] = time.time()
+            self.invalidate(market, source)
+            return True
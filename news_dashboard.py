@@ -1,56 +1,333 @@
+import html
+import json
 import streamlit as st
-from google import genai
-from rss_collector import fetch_rss_feeds, fetch_naver_news, SOURCES
+from rss_collector import fetch_naver_news, SOURCES
+from naver_client import NAVER_DISPLAY_MAX
+from news_store import NewsStore
+from news_ingest import NewsIngestor
+from news_cache import SourceNewsCache
+from analysis_cache import AnalysisCache, make_analysis_key
+from gemini_client import client_pool
+from gemini_scheduler import scheduler
+from assets import inject_css
+from news_list import news_list, article_payload
 
-# CSS 파일을 불러오는 유틸리티 함수
-def local_css(file_name):
-    with open(file_name, encoding="utf-8") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# --- 백그라운드 뉴스 수집기 (프로세스당 1개) ---
+@st.cache_resource
+def get_news_store():
+    return NewsStore()
+
+@st.cache_resource
+def get_ingestor():
+    ingestor = NewsIngestor(get_news_store())
+    ingestor.start()
+    return ingestor
+
+@st.cache_resource
+def get_news_cache():
+    return SourceNewsCache(get_news_store(), get_ingestor())
+
+# 언론사별로 목록에 싣는 최대 기사 수 (브라우저에서 페이지 단위로 펼쳐 봄)
+NEWS_LIST_LIMIT = 200
+# 언론사 선택지 중 시장 전체 목록 (여러 언론사의 같은 기사는 스토리별로 하나만 표시)
+ALL_SOURCES = "전체"
+
+def load_source_news(market, name, limit=NEWS_LIST_LIMIT):
+    """(market, name) 단위 캐시에서 언론사 뉴스를 읽습니다. (name이 ALL_SOURCES면 시장 전체)"""
+    return get_news_cache().get(market, None if name == ALL_SOURCES else name, limit=limit)
 
 # --- Gemini 요약 함수 ---
-def analyze_news_gemini(api_key, title, summary):
+GEMINI_MODEL = "gemini-3-flash-preview"
+PROMPT_TEMPLATE = "투자 전문가로서 뉴스 분석: {title}\n내용: {summary}. 핵심요약, 시장영향, 투자포인트 작성."
+
+@st.cache_resource
+def get_analysis_cache():
+    return AnalysisCache()
+
+# --- Gemini 스트리밍 분석 함수 (토큰이 생성되는 대로 전달) ---
+def stream_news_gemini(api_key, title, summary):
+    """
+    분석 결과를 조각(chunk) 단위로 yield 합니다.
+    캐시에 있으면 저장된 결과를 한 번에 돌려주고, 스트림이 끝나면 전체 텍스트를 캐시에 저장합니다.
+    분석에 실패하면 예외가 그대로 전달됩니다. (실패 메시지를 결과로 돌려주지 않음)
+    """
+    cache_key = make_analysis_key(GEMINI_MODEL, PROMPT_TEMPLATE, title, summary)
+    cache = get_analysis_cache()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    client = client_pool.get(api_key)
+    prompt = PROMPT_TEMPLATE.format(title=title, summary=summary)
+
+    def make_stream():
+        for chunk in client.models.generate_content_stream(model=GEMINI_MODEL, contents=prompt):
+            if chunk.text:
+                yield chunk.text
+
+    for text in scheduler.stream(api_key, cache_key, make_stream):
+        parts.append(text)
+        yield text
+
+    # 끝까지 정상 수신한 결과만 저장합니다.
+    if parts:
+        cache.put(cache_key, "".join(parts))
+
+# --- Gemini 일괄 분석 함수 (화면에 보이는 기사들을 한 번의 호출로 분석) ---
+BATCH_PROMPT_TEMPLATE = """투자 전문가로서 아래 뉴스 {count}건을 각각 분석하세요.
+뉴스마다 핵심요약, 시장영향, 투자포인트를 작성하고,
+반드시 다음 형식의 JSON 배열로만 답하세요: [{{"id": 뉴스 번호, "analysis": "분석 내용"}}]
+
+{articles}"""
+
+def analyze_news_batch_gemini(api_key, articles):
+    """
+    articles: [(title, summary), ...]
+    반환: (results, errors) - 입력과 같은 순서의 분석 결과 리스트와 실패 메시지 리스트.
+    실패한 기사는 results가 None이고 errors에 이유가 들어갑니다. (성공한 기사의 errors는 None)
+    캐시에 있는 기사는 제외하고 나머지만 한 번의 요청으로 분석하며,
+    결과는 기사별 캐시에 저장되어 개별 분석 버튼에서도 재사용됩니다.
+    """
+    cache = get_analysis_cache()
+    keys = [make_analysis_key(GEMINI_MODEL, PROMPT_TEMPLATE, t, s) for t, s in articles]
+    results = [cache.get(k) for k in keys]
+    errors = [None] * len(articles)
+    pending = [i for i, res in enumerate(results) if res is None]
+    if not pending:
+        return results, errors
+
+    article_text = "\n\n".join(
+        f"[{n}] 제목: {articles[i][0]}\n내용: {articles[i][1]}" for n, i in enumerate(pending, start=1)
+    )
+    prompt = BATCH_PROMPT_TEMPLATE.format(count=len(pending), articles=article_text)
     try:
-        client = genai.Client(api_key=api_key.strip())
-        prompt = f"투자 전문가로서 뉴스 분석: {title}\n내용: {summary}. 핵심요약, 시장영향, 투자포인트 작성."
-        response = client.models.generate_content(model="gemini-3-flash-preview", contents=prompt)
-        return response.text
+        client = client_pool.get(api_key)
+        batch_key = make_analysis_key(GEMINI_MODEL, BATCH_PROMPT_TEMPLATE, prompt, "")
+        response_text = scheduler.call(
+            api_key, batch_key,
+            lambda: client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config={"response_mime_type": "application/json"}
+            ).text
+        )
+        parsed = {int(item["id"]): item["analysis"] for item in json.loads(response_text)}
     except Exception as e:
-        return f"⚠️ 분석 실패: {str(e)}"
+        for i in pending:
+            errors[i] = str(e)
+        return results, errors
+
+    for n, i in enumerate(pending, start=1):
+        analysis = parsed.get(n)
+        if analysis:
+            cache.put(keys[i], analysis)
+            results[i] = analysis
+        else:
+            errors[i] = "응답에서 해당 뉴스의 결과를 찾지 못했습니다."
+    return results, errors
+
+def get_gemini_key_or_warn():
+    """로그인 및 API 키 등록 여부를 확인하고, 사용 가능한 키를 반환합니다."""
+    if not st.session_state.logged_in:
+        st.warning("로그인이 필요합니다.")
+        return None
+    if not st.session_state.user_keys['GEMINI']:
+        st.error("API 키를 등록해주세요.")
+        return None
+    return st.session_state.user_keys['GEMINI']
+
+def analysis_input(row):
+    """
+    AI 분석에 사용할 (제목, 요약).
+    같은 스토리로 묶인 기사는 대표 기사의 제목/요약을 사용하여 분석 결과(캐시)를 공유합니다.
+    """
+    title = row.get('analysis_title') or row['title']
+    summary = row.get('analysis_summary') or row['summary']
+    return title, summary
+
+# --- 뉴스 목록 렌더링 함수 (목록 전체를 하나의 컴포넌트로 전송) ---
+# 한 번의 일괄 분석 요청에 넣는 최대 기사 수
+ANALYSIS_BATCH_SIZE = 10
+
+def run_analysis_request(api_key, df, links, ai_results, ai_errors, placeholder):
+    """
+    컴포넌트에서 들어온 분석 요청을 처리합니다.
+    성공한 결과는 ai_results(링크 -> 결과)에, 실패 이유는 ai_errors(링크 -> 메시지)에 저장하여
+    실패한 기사는 카드에 분석 버튼이 남아 다시 요청할 수 있습니다.
+    """
+    rows = {row['link']: row for row in df.to_dict('records')}
+    links = [link for link in dict.fromkeys(links) if link in rows and link not in ai_results]
+    for link in links:
+        ai_errors.pop(link, None)
+    if len(links) == 1:
+        # 기사 하나는 첫 토큰부터 바로 목록 위에 표시 (전체 생성 완료를 기다리지 않음)
+        row = rows[links[0]]
+        text = ""
+        try:
+            for chunk in stream_news_gemini(api_key, *analysis_input(row)):
+                text += chunk
+                # 기사 제목과 모델 응답은 외부 입력이므로 HTML로 해석되지 않게 이스케이프합니다.
+                placeholder.markdown(
+                    f'<div class="ai-result"><b>🤖 {html.escape(row["title"])}</b><br>{html.escape(text)}▌</div>',
+                    unsafe_allow_html=True
+                )
+        except Exception as e:
+            ai_errors[links[0]] = str(e)
+        else:
+            if text:
+                ai_results[links[0]] = text
+            else:
+                ai_errors[links[0]] = "빈 응답을 받았습니다."
+    elif links:
+        with placeholder, st.spinner(f"뉴스 {len(links)}건을 한 번에 분석 중..."):
+            for i in range(0, len(links), ANALYSIS_BATCH_SIZE):
+                chunk = links[i:i + ANALYSIS_BATCH_SIZE]
+                results, errors = analyze_news_batch_gemini(api_key, [analysis_input(rows[link]) for link in chunk])
+                for link, result, error in zip(chunk, results, errors):
+                    if result is None:
+                        ai_errors[link] = error
+                    else:
+                        ai_results[link] = result
+    placeholder.empty()
 
-# --- 개별 뉴스 카드 렌더링 함수 ---
 def display_news_cards(df, market_key):
-    local_css("style_global.css")
+    inject_css("style_global.css")  # 이번 렌더에서 이미 넣었다면 건너뜀
     if df.empty:
         st.info("표시할 뉴스가 없습니다.")
         return
 
-    for idx, row in df.head(10).iterrows():
-        with st.container():
-            pub_time = row["published"].strftime("%m/%d %H:%M")
-            st.markdown(
-                f'''
-                <div class="news-card">
-                    <a href="{row["link"]}" target="_blank" style="text-decoration:none; color:inherit;">
-                        <h3 style="margin-bottom:5px;">{row["title"]}</h3>
-                    </a>
-                    <p style="color:#6B7280; font-size:0.9rem;">
-                        📅 {row["published"].strftime("%Y-%m-%d %H:%M")} | 🏢 주요 언론사 뉴스
-                    </p>
-                </div>
-                ''',
-                unsafe_allow_html=True
-            )
-
-            if st.button(f"🤖 AI 분석 실행", key=f"ai_{market_key}_{idx}"):
-                if st.session_state.logged_in:
-                    if st.session_state.user_keys['GEMINI']:
-                        with st.spinner("AI 분석 중..."):
-                            res = analyze_news_gemini(st.session_state.user_keys['GEMINI'], row['title'], row['summary'])
-                            st.markdown(f'<div class="ai-result">{res}</div>', unsafe_allow_html=True)
-                    else:
-                        st.error("API 키를 등록해주세요.")
-                else:
-                    st.warning("로그인이 필요합니다.")
+    # 카드별 분석 결과 (링크 -> 결과). 리런되어도 화면에 유지됩니다.
+    results_key = f"ai_results_{market_key}"
+    ai_results = st.session_state.setdefault(results_key, {})
+    # 실패한 분석의 이유 (링크 -> 메시지). 결과와 따로 두어 카드에 다시 분석 버튼을 보여줍니다.
+    ai_errors = st.session_state.setdefault(f"ai_errors_{market_key}", {})
+    component_key = f"news_list_{market_key}"
+    handled_key = f"{component_key}_handled"
+
+    # 컴포넌트의 마지막 값(분석 요청)을 렌더링 전에 확인하여, 처리할 기사를 '분석 중'으로 표시합니다.
+    request = st.session_state.get(component_key)
+    api_key, busy = None, []
+    if request and request.get("nonce") != st.session_state.get(handled_key):
+        st.session_state[handled_key] = request["nonce"]
+        api_key = get_gemini_key_or_warn()
+        if api_key:
+            busy = request["links"]
+
+    placeholder = st.empty()
+    news_list(
+        article_payload(df, ai_results, ai_errors),
+        list_key=f"{market_key}:{df['link'].iloc[0]}:{len(df)}",
+        busy=busy, key=component_key
+    )
+
+    if busy:
+        run_analysis_request(api_key, df, busy, ai_results, ai_errors, placeholder)
+        # 결과를 목록 컴포넌트에 반영
+        st.rerun()
+
+# --- 시장별 언론사 화면 렌더링 함수 (선택된 언론사 하나만 수집/렌더링) ---
+def render_market_section(market, flag, key_prefix, title_suffix):
+    source_names = list(SOURCES[market].keys()) + [ALL_SOURCES]
+    name = st.radio(
+        "언론사 선택", source_names,
+        horizontal=True, label_visibility="collapsed", key=f"source_{key_prefix}"
+    )
+    i = source_names.index(name)
+
+    st.subheader(f"{flag} {name} {title_suffix}")
+    if st.button(f"🔄 {name} 새로고침", key=f"refresh_{key_prefix}_{i}"):
+        # 전체 캐시(st.cache_data.clear)가 아닌 이 언론사의 캐시만 갱신합니다.
+        if not get_news_cache().refresh(market, None if name == ALL_SOURCES else name):
+            st.toast("방금 새로고침되었습니다. 잠시 후 다시 시도해주세요.")
+        st.rerun()
+
+    news_df = load_source_news(market, name)
+    display_news_cards(news_df, f"{key_prefix.upper()}_{name}")
+
+# --- 뉴스 검색 화면 렌더링 함수 (로컬 전문 검색 색인 + 네이버 보조 검색) ---
+SEARCH_MARKETS = {"전체": None, "국내": "KOREA", "미국": "USA"}
+SEARCH_PAGE_SIZE = 50
+
+def fetch_naver_page(query, page):
+    """
+    네이버 검색 결과 한 페이지(API 최대치 100건)를 받아 로컬 색인에 저장합니다.
+    반환: 네이버 전체 결과 수 (실패 시 0). 같은 검색어/페이지는 공유 캐시에서 재사용됩니다.
+    """
+    with st.spinner(f"'{query}' 네이버 뉴스 검색 중... ({page}페이지)"):
+        df_naver, total = fetch_naver_news(query, page=page, display=NAVER_DISPLAY_MAX)
+        # 네이버 결과도 색인에 저장하여 로컬 검색 결과에 합쳐집니다.
+        if not df_naver.empty:
+            get_news_store().upsert_articles("KOREA", "네이버", df_naver.to_dict("records"))
+    return total
+
+def render_search_section():
+    st.subheader("🔎 키워드로 뉴스 찾기")
+    # 검색 폼 사용 (엔터를 치거나 버튼을 누를 때만 실행)
+    with st.form(key="search_form"):
+        col1, col2, col3 = st.columns([3, 1, 2])
+        with col1:
+            query = st.text_input("검색어를 입력하세요", key="search_input_field")
+        with col2:
+            search_market = st.selectbox("시장", list(SEARCH_MARKETS.keys()))
+        with col3:
+            date_range = st.date_input("기간 (선택)", value=(), key="search_date_range")
+        use_naver = st.checkbox("네이버 뉴스도 함께 검색", value=True)
+
+        submit_btn = st.form_submit_button("검색 실행")
+
+    # 검색 버튼을 누르면 검색 조건을 세션에 저장 (결과는 로컬 색인에서 매번 바로 조회)
+    if submit_btn and query:
+        # 네이버는 첫 페이지만 바로 받고, 더 필요하면 결과 아래 버튼으로 다음 페이지를 받습니다.
+        naver_total = 0
+        if use_naver and SEARCH_MARKETS[search_market] != "USA":
+            naver_total = fetch_naver_page(query, 1)
+
+        date_from, date_to = (list(date_range) + [None, None])[:2]
+        st.session_state['last_search'] = {
+            'query': query,
+            'market': SEARCH_MARKETS[search_market],
+            'date_from': date_from,
+            'date_to': date_to or date_from,
+            'naver_page': 1,
+            'naver_total': naver_total,
+        }
+        st.session_state['search_page'] = 1
+
+    # 페이지가 새로고침되어도 세션에 검색 조건이 있으면 출력
+    if 'last_search' in st.session_state:
+        cond = st.session_state['last_search']
+        page = st.session_state.get('search_page', 1)
+        df_res, total = get_news_store().search_articles(
+            cond['query'], market=cond['market'], date_from=cond['date_from'], date_to=cond['date_to'],
+            page=page, page_size=SEARCH_PAGE_SIZE
+        )
+        last_page = max(1, -(-total // SEARCH_PAGE_SIZE))
+        st.write(f"### '{cond['query']}' 검색 결과 ({total}건)")
+        display_news_cards(df_res, "SEARCH_RESULT")
+
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀ 이전", key="search_prev", disabled=page <= 1):
+                st.session_state['search_page'] = page - 1
+                st.rerun()
+        with col_page:
+            st.caption(f"{page} / {last_page} 페이지")
+        with col_next:
+            if st.button("다음 ▶", key="search_next", disabled=page >= last_page):
+                st.session_state['search_page'] = page + 1
+                st.rerun()
+
+        # 네이버 결과가 더 있으면 다음 페이지를 받아 색인에 추가 (API 범위: 최대 1,000건)
+        naver_page = cond.get('naver_page', 0)
+        if naver_page and naver_page * NAVER_DISPLAY_MAX < cond.get('naver_total', 0):
+            fetched = naver_page * NAVER_DISPLAY_MAX
+            if st.button(f"📥 네이버 뉴스 더 가져오기 ({fetched} / {cond['naver_total']}건)", key="search_naver_more"):
+                total = fetch_naver_page(cond['query'], naver_page + 1)
+                if total:
+                    cond.update(naver_page=naver_page + 1, naver_total=total)
+                    st.rerun()
 
 # --- 메인 뉴스 화면 렌더링 함수 ---
 def render_news_section():
@@ -62,65 +339,24 @@ def render_news_section():
     **Gemini AI**를 통해 투자 포인트를 분석하여 제공합니다.
     """)
 
-    # 1단계 메인 탭: 국내장, 미국장
-    tab_kor, tab_usa, tab_search = st.tabs(["🇰🇷 국내장", "🇺🇸 미국장", "🔍 뉴스 검색"])
+    # 1단계 메인 메뉴: 국내장, 미국장, 뉴스 검색
+    # st.tabs는 선택되지 않은 탭의 본문까지 매번 실행하므로,
+    # 라디오 버튼으로 현재 보고 있는 화면 하나만 수집/렌더링합니다.
+    main_view = st.radio(
+        "보기 선택", ["🇰🇷 국내장", "🇺🇸 미국장", "🔍 뉴스 검색"],
+        horizontal=True, label_visibility="collapsed", key="news_main_view"
+    )
 
     # --- 국내장 섹션 ---
-    with tab_kor:
-        kor_source_names = list(SOURCES["KOREA"].keys())
-        # 2단계 하위 탭: 국내 언론사 6개
-        sub_tabs_kor = st.tabs(kor_source_names)
-
-        for i, name in enumerate(kor_source_names):
-            with sub_tabs_kor[i]:
-                st.subheader(f"🇰🇷 {name} 증시 뉴스")
-                if st.button(f"🔄 {name} 새로고침", key=f"refresh_kor_{i}"):
-                    st.cache_data.clear()
-                    st.rerun()
-
-                news_df = fetch_rss_feeds("KOREA", source_name=name)
-                display_news_cards(news_df, f"KOR_{name}")
+    if main_view == "🇰🇷 국내장":
+        # 2단계 하위 메뉴: 국내 언론사 6개
+        render_market_section("KOREA", "🇰🇷", "kor", "증시 뉴스")
 
     # --- 미국장 섹션 ---
-    with tab_usa:
-        usa_source_names = list(SOURCES["USA"].keys())
-        # 2단계 하위 탭: 미국 관련 소스 2개
-        sub_tabs_usa = st.tabs(usa_source_names)
-
-        for i, name in enumerate(usa_source_names):
-            with sub_tabs_usa[i]:
-                st.subheader(f"🇺🇸 {name} 뉴스")
-                if st.button(f"🔄 {name} 새로고침", key=f"refresh_usa_{i}"):
-                    st.cache_data.clear()
-                    st.rerun()
-
-                news_df = fetch_rss_feeds("USA", source_name=name)
-                display_news_cards(news_df, f"USA_{name}")
+    elif main_view == "🇺🇸 미국장":
+        # 2단계 하위 메뉴: 미국 관련 소스
+        render_market_section("USA", "🇺🇸", "usa", "뉴스")
 
     # --- [신규] 뉴스 검색 탭 ---
-    with tab_search:
-        st.subheader("🔎 키워드로 뉴스 찾기")
-        # 검색 폼 사용 (엔터를 치거나 버튼을 누를 때만 실행)
-        with st.form(key="search_form"):
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                query = st.text_input("검색어를 입력하세요", key="search_input_field")
-            with col2:
-                search_market = st.selectbox("시장", ["국내(Naver)"])
-
-            submit_btn = st.form_submit_button("검색 실행")
-
-        # 검색 버튼을 누르면 결과를 세션에 저장
-        if submit_btn and query:
-            with st.spinner(f"'{query}' 검색 중..."):
-                if search_market == "국내(Naver)":
-                    df_res = fetch_naver_news(query)
-
-                # 검색 결과와 키워드를 세션에 저장 (핵심!)
-                st.session_state['last_search_df'] = df_res
-                st.session_state['last_query'] = query
-
-        # 페이지가 새로고침되어도 세션에 결과가 있으면 출력
-        if 'last_search_df' in st.session_state:
-            st.write(f"### '{st.session_state.last_query}' 검색 결과")
-            display_news_cards(st.session_state.last_search_df, "SEARCH_RESULT")
\ No newline at end of file
+    else:
+        render_search_section()
@@ -0,0 +1,87 @@
+# news_ingest.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rss_collector import SOURCES, FEED_MAX_WORKERS, feed_differ, fetch_new_entries
+
+# 전체 언론사 수집 주기 (초)
+INGEST_INTERVAL = 120
+
+
+class NewsIngestor(threading.Thread):
+    """
+    SOURCES에 등록된 모든 언론사를 주기적으로 수집하여 NewsStore에 저장하는 백그라운드 스레드.
+    페이지 렌더링과 수집이 분리되므로, 접속자가 몇 명이든 수집은 프로세스당 한 번만 일어납니다.
+    """
+
+    def __init__(self, store, interval=INGEST_INTERVAL):
+        super().__init__(name="news-ingestor", daemon=True)
+        self.store = store
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._source_locks = {
+            (market, name): threading.Lock()
+            for market, sources in SOURCES.items()
+            for name in sources
+        }
+        self._listeners = []
+
+    def run(self):
+        while not self._stop_event.is_set():
+            started = time.time()
+            try:
+                self.ingest_all()
+            except Exception as e:
+                print(f"⚠️ 뉴스 수집 루프 오류: {e}")
+            print(f"✅ 뉴스 수집 완료 ({time.time() - started:.1f}s)")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def add_listener(self, callback):
+        """언론사 기사가 저장될 때마다 callback(market, name)을 호출합니다."""
+        self._listeners.append(callback)
+
+    def ingest_source(self, market, name):
+        """언론사 하나를 즉시 수집하여 저장합니다. 같은 언론사의 동시 요청은 하나로 합쳐집니다."""
+        url = SOURCES.get(market, {}).get(name)
+        lock = self._source_locks.get((market, name))
+        if not url or lock is None:
+            return 0
+
+        # 이미 다른 스레드가 같은 언론사를 수집 중이면 끝날 때까지 기다렸다가 그 결과를 사용합니다.
+        if not lock.acquire(blocking=False):
+            with lock:
+                return 0
+        try:
+            # 저장소에 이미 있는 기사를 먼저 등록해 두고, 새 기사만 저장합니다.
+            if not feed_differ.is_seeded((market, name)):
+                feed_differ.seed((market, name), self.store.recent_links(market, name))
+            articles = fetch_new_entries(market, name)
+            saved = self.store.upsert_articles(market, name, articles)
+            # 저장에 성공한 기사만 '본 기사'로 등록 (실패하면 다음 수집 때 다시 저장 시도)
+            feed_differ.mark_seen((market, name), [a['link'] for a in articles])
+        except Exception as e:
+            print(f"⚠️ {market}/{name} 저장 실패: {e}")
+            return 0
+        finally:
+            lock.release()
+
+        if saved:
+            for callback in self._listeners:
+                callback(market, name)
+        return saved
+
+    def ingest_market(self, market):
+        """시장 하나의 모든 언론사를 동시에 수집합니다. (시장 전체 목록을 처음 볼 때)"""
+        self._ingest_many([(market, name) for name in SOURCES.get(market, {})])
+
+    def ingest_all(self):
+        self._ingest_many([(market, name) for market, sources in SOURCES.items() for name in sources])
+
+    def _ingest_many(self, targets):
+        if not targets:
+            return
+        with ThreadPoolExecutor(max_workers=min(FEED_MAX_WORKERS, len(targets))) as pool:
+            list(pool.map(lambda t: self.ingest_source(*t), targets))
@@ -0,0 +1,41 @@
+# news_list.py
+import os
+import pandas as pd
+import streamlit.components.v1 as components
+
+# 한 번에 펼치는 카드 수 (나머지는 브라우저에서 '더 보기'/스크롤로 펼침)
+NEWS_LIST_PAGE_SIZE = 10
+
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_list_frontend")
+_news_list = components.declare_component("news_list", path=_FRONTEND_DIR)
+
+
+def article_payload(df, results, errors=None):
+    """컴포넌트로 보낼 기사 목록 (JSON 직렬화 가능한 값만). errors: 분석 실패 이유 (링크 -> 메시지)"""
+    errors = errors or {}
+    articles = []
+    for row in df.to_dict("records"):
+        published = row.get("published")
+        cluster_size = row.get("cluster_size")
+        articles.append({
+            "title": row["title"],
+            "link": row["link"],
+            "published": published.strftime("%Y-%m-%d %H:%M") if isinstance(published, pd.Timestamp) and pd.notna(published) else str(published or ""),
+            "source": row.get("source") or "",
+            "cluster_size": int(cluster_size) if pd.notna(cluster_size) and cluster_size else 1,
+            "result": results.get(row["link"]),
+            "error": errors.get(row["link"]),
+        })
+    return articles
+
+
+def news_list(articles, list_key, busy=(), page_size=NEWS_LIST_PAGE_SIZE, key=None):
+    """
+    뉴스 목록 전체를 하나의 컴포넌트로 렌더링합니다.
+    카드/버튼이 위젯 하나로 묶이므로 기사 수가 늘어도 리런 시 전송량과 위젯 수가 늘지 않습니다.
+    반환값: 마지막 분석 요청 {"action": "analyze", "links": [...], "nonce": ...} 또는 None
+    """
+    return _news_list(
+        articles=articles, list_key=list_key, busy=list(busy), page_size=page_size,
+        key=key, default=None
+    )
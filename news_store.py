@@ -0,0 +1,289 @@
+# news_store.py
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+import pandas as pd
+from feed_cache import CACHE_DIR
+from story_cluster import StoryClusterer
+from published_dates import DISPLAY_TZ, MARKET_TZ, STORE_FORMAT, date_parser, to_display, to_store_strings
+
+NEWS_DB_PATH = os.path.join(CACHE_DIR, "news.db")
+NEWS_COLUMNS = ['title', 'link', 'published', 'summary']
+# trigram 색인으로 찾을 수 있는 최소 검색어 길이 (더 짧은 단어는 LIKE로 검색)
+FTS_MIN_TERM = 3
+# 스토리(중복 기사 묶음) 정보: 같은 스토리의 기사는 대표 기사의 제목/요약으로 AI 분석을 공유합니다.
+CLUSTER_COLUMNS = ['cluster_id', 'cluster_size', 'analysis_title', 'analysis_summary']
+
+
+def normalize_published(values, market=None, source=None):
+    """
+    발행일 목록을 UTC 문자열로 변환합니다. (파싱 실패 시 None)
+    언론사별로 기억해 둔 형식으로 한 번에 파싱하고, 시간대 표기가 없으면 시장 기준 시간대로 해석합니다.
+    """
+    parsed = date_parser.parse(f"{market}:{source}", values, naive_tz=MARKET_TZ.get(market, "UTC"))
+    return to_store_strings(parsed)
+
+
+class NewsStore:
+    """
+    수집된 기사를 저장하는 로컬 SQLite 저장소.
+    백그라운드 수집기가 쓰고, 대시보드는 이 저장소만 읽습니다.
+    """
+
+    def __init__(self, path=NEWS_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    link TEXT PRIMARY KEY,
+                    market TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    title TEXT,
+                    summary TEXT,
+                    published TEXT,
+                    fetched_at REAL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_articles_source "
+                "ON articles (market, source, published DESC)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published)")
+            self._create_fts(conn)
+
+            # 스토리 묶음(cluster) 컬럼/색인 - 이전 버전 DB에는 컬럼을 추가하고 기존 기사를 한 번 묶어줍니다.
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(articles)")]
+            if 'cluster_id' not in columns:
+                conn.execute("ALTER TABLE articles ADD COLUMN cluster_id INTEGER")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_cluster ON articles (cluster_id)")
+            self.clusterer = StoryClusterer()
+            self.clusterer.create_tables(conn)
+            unassigned = [r[0] for r in conn.execute("SELECT rowid FROM articles WHERE cluster_id IS NULL ORDER BY rowid")]
+            self.clusterer.assign(conn, unassigned)
+
+    @staticmethod
+    def _create_fts(conn):
+        """
+        기사 전문 검색용 FTS5 색인 (articles 테이블을 원본으로 하는 external content 방식).
+        한국어 복합어 안의 단어("삼성전자"의 "전자")도 찾을 수 있도록 trigram 토크나이저를 사용합니다.
+        트리거로 articles의 추가/수정/삭제가 색인에 자동 반영됩니다.
+        """
+        existing = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+        ).fetchone()
+        # 이전 버전(unicode61)으로 만든 색인은 지우고 trigram으로 다시 만듭니다.
+        if existing and "trigram" not in existing[0]:
+            conn.executescript("""
+                DROP TRIGGER IF EXISTS articles_fts_ai;
+                DROP TRIGGER IF EXISTS articles_fts_ad;
+                DROP TRIGGER IF EXISTS articles_fts_au;
+                DROP TABLE articles_fts;
+            """)
+            existing = None
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, summary, source, market,
+                content='articles', content_rowid='rowid', tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, summary, source, market)
+                VALUES (new.rowid, new.title, new.summary, new.source, new.market);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, source, market)
+                VALUES ('delete', old.rowid, old.title, old.summary, old.source, old.market);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, source, market)
+                VALUES ('delete', old.rowid, old.title, old.summary, old.source, old.market);
+                INSERT INTO articles_fts (rowid, title, summary, source, market)
+                VALUES (new.rowid, new.title, new.summary, new.source, new.market);
+            END;
+        """)
+        # 색인 도입(또는 토크나이저 변경) 이전에 저장된 기사도 검색되도록 최초 1회 재구성
+        if not existing:
+            conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def upsert_articles(self, market, source, articles):
+        """한 언론사의 기사 목록을 저장합니다. (링크 기준으로 중복 제거)"""
+        if not articles:
+            return 0
+        published = normalize_published([a.get('published') for a in articles], market, source)
+        now = time.time()
+        rows = [
+            (a.get('link'), market, source, a.get('title'), a.get('summary'), pub or None, now)
+            for a, pub in zip(articles, published)
+            if a.get('link')
+        ]
+        links = [row[0] for row in rows]
+        with self._connect() as conn:
+            existing = set()
+            for i in range(0, len(links), 500):
+                chunk = links[i:i + 500]
+                existing.update(r[0] for r in conn.execute(
+                    f"SELECT link FROM articles WHERE link IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            conn.executemany("""
+                INSERT INTO articles (link, market, source, title, summary, published, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(link) DO UPDATE SET
+                    title = excluded.title,
+                    summary = excluded.summary,
+                    published = COALESCE(excluded.published, articles.published),
+                    fetched_at = excluded.fetched_at
+            """, rows)
+
+            # 처음 저장된 기사만 스토리 묶음 대상 (이미 있는 링크는 중복이므로 건너뜀)
+            new_links = [link for link in dict.fromkeys(links) if link not in existing]
+            new_rowids = []
+            for i in range(0, len(new_links), 500):
+                chunk = new_links[i:i + 500]
+                new_rowids.extend(r[0] for r in conn.execute(
+                    f"SELECT rowid FROM articles WHERE link IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            self.clusterer.assign(conn, sorted(new_rowids))
+        return len(rows)
+
+    def read_articles(self, market, source=None, limit=10, sources=None):
+        """
+        저장된 기사를 최신순으로 읽어 DataFrame으로 반환합니다.
+        published는 한국 시간(KST) 기준 datetime으로 변환됩니다.
+        source가 None이면 시장 전체(sources를 주면 그 언론사들)에서 스토리(cluster)별로 최신 기사 하나만 반환합니다.
+        """
+        # 발행일이 없는 기사는 수집 시각으로 대체합니다.
+        sql = (
+            "SELECT a.title, a.link, COALESCE(a.published, datetime(a.fetched_at, 'unixepoch')) AS published, "
+            "a.summary, a.cluster_id, "
+            "(SELECT COUNT(DISTINCT c.source) FROM articles c WHERE c.cluster_id = a.cluster_id), "
+            "COALESCE(r.title, a.title), COALESCE(r.summary, a.summary) "
+            "FROM articles a LEFT JOIN articles r ON r.rowid = a.cluster_id WHERE a.market = ?"
+        )
+        params = [market]
+        if source:
+            sql += " AND a.source = ?"
+            params.append(source)
+        else:
+            source_filter = ""
+            if sources:
+                # 네이버 검색 결과처럼 목록 대상이 아닌 기사는 제외합니다.
+                placeholders = ",".join("?" * len(sources))
+                sql += f" AND a.source IN ({placeholders})"
+                source_filter = f" AND b.source IN ({placeholders})"
+                params += list(sources) * 2
+            sql += (
+                " AND a.rowid = (SELECT b.rowid FROM articles b WHERE b.cluster_id = a.cluster_id AND b.market = a.market"
+                f"{source_filter} ORDER BY b.published DESC LIMIT 1)"
+            )
+        sql += " ORDER BY published DESC LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        df = pd.DataFrame(rows, columns=NEWS_COLUMNS + CLUSTER_COLUMNS)
+        if not df.empty:
+            df['published'] = to_display(pd.to_datetime(df['published'], format=STORE_FORMAT, utc=True))
+        return df
+
+    def recent_links(self, market, source, limit=2000):
+        """언론사의 최근 기사 링크 목록 (오래된 것부터)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT link FROM articles WHERE market = ? AND source = ? ORDER BY fetched_at DESC, rowid DESC LIMIT ?",
+                (market, source, limit)
+            ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def has_articles(self, market, source=None):
+        """source가 None이면 시장 전체에 저장된 기사가 있는지 확인합니다."""
+        sql, params = "SELECT 1 FROM articles WHERE market = ?", [market]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        with self._connect() as conn:
+            row = conn.execute(sql + " LIMIT 1", params).fetchone()
+        return row is not None
+
+    def search_articles(self, query, market=None, date_from=None, date_to=None, page=1, page_size=20):
+        """
+        저장된 기사를 키워드로 검색합니다. (제목 가중치가 높은 BM25 순위)
+        date_from / date_to: 한국 날짜(date) 기준 범위, page: 1부터 시작
+        반환: (결과 DataFrame, 전체 건수)
+        """
+        terms = [t for t in query.split() if t]
+        if not terms:
+            return pd.DataFrame(columns=NEWS_COLUMNS + CLUSTER_COLUMNS + ['source']), 0
+        # trigram 색인은 세 글자 이상인 단어를 부분 문자열로 찾습니다. ("삼성전" -> 삼성전자, 삼성전기 ...)
+        # 두 글자 이하 단어("전자", "삼성")는 색인으로 찾을 수 없으므로 LIKE로 걸러냅니다.
+        long_terms = [t for t in terms if len(t) >= FTS_MIN_TERM]
+        short_terms = [t for t in terms if len(t) < FTS_MIN_TERM]
+
+        if long_terms:
+            from_sql = "articles_fts JOIN articles a ON a.rowid = articles_fts.rowid"
+            score = "bm25(articles_fts, 10.0, 1.0, 0.5, 0.5)"
+            where = "articles_fts MATCH ?"
+            params = [" ".join('"' + t.replace('"', '""') + '"' for t in long_terms)]
+        else:
+            # 색인을 쓸 단어가 없으면 관련도 없이 최신순으로 정렬합니다.
+            from_sql, score, where, params = "articles a", "0", "1", []
+        for t in short_terms:
+            pattern = "%" + t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where += " AND (a.title LIKE ? ESCAPE '\\' OR a.summary LIKE ? ESCAPE '\\' OR a.source LIKE ? ESCAPE '\\')"
+            params += [pattern] * 3
+        if market:
+            where += " AND a.market = ?"
+            params.append(market)
+        if date_from:
+            where += " AND a.published >= ?"
+            params.append(_kst_date_to_utc(date_from))
+        if date_to:
+            where += " AND a.published < ?"
+            params.append(_kst_date_to_utc(date_to, next_day=True))
+
+        # 같은 스토리(cluster)의 기사는 가장 관련도가 높은 기사 하나만 결과에 포함합니다.
+        matched = (
+            "SELECT a.rowid AS rid, COALESCE(a.cluster_id, a.rowid) AS story, "
+            f"{score} AS score FROM {from_sql} WHERE {where}"
+        )
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(DISTINCT story) FROM ({matched})", params).fetchone()[0]
+            # bm25()는 집계 함수 안에서 쓸 수 없으므로 MATERIALIZED CTE로 점수를 먼저 계산합니다.
+            rows = conn.execute(
+                f"""
+                WITH matched AS MATERIALIZED ({matched})
+                SELECT a.title, a.link, COALESCE(a.published, datetime(a.fetched_at, 'unixepoch')), a.summary,
+                       a.cluster_id,
+                       (SELECT COUNT(DISTINCT c.source) FROM articles c WHERE c.cluster_id = a.cluster_id),
+                       COALESCE(r.title, a.title), COALESCE(r.summary, a.summary), a.source, best.score
+                FROM (SELECT rid, MIN(score) AS score FROM matched GROUP BY story) best
+                JOIN articles a ON a.rowid = best.rid
+                LEFT JOIN articles r ON r.rowid = a.cluster_id
+                ORDER BY best.score, a.published DESC LIMIT ? OFFSET ?
+                """,
+                params + [page_size, (max(page, 1) - 1) * page_size]
+            ).fetchall()
+
+        df = pd.DataFrame([row[:-1] for row in rows], columns=NEWS_COLUMNS + CLUSTER_COLUMNS + ['source'])
+        if not df.empty:
+            df['published'] = to_display(pd.to_datetime(df['published'], format=STORE_FORMAT, utc=True))
+        return df, total
+
+
+def _kst_date_to_utc(day, next_day=False):
+    """한국 날짜의 0시를 UTC 문자열로 변환 (next_day=True면 다음 날 0시)"""
+    ts = pd.Timestamp(day).tz_localize(DISPLAY_TZ)
+    if next_day:
+        ts += pd.Timedelta(days=1)
+    return ts.tz_convert("UTC").strftime("%Y-%m-%d %H:%M:%S")
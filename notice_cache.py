@@ -0,0 +1,91 @@
+# notice_cache.py
+import threading
+import time
+from storage import TABLES
+
+NOTICE_COLUMNS = TABLES["Notice"]["columns"]
+# 다른 인스턴스(또는 시트를 직접 수정한 경우)의 변경을 반영하기 위해 다시 읽는 최대 주기 (초)
+NOTICE_MAX_AGE = 10 * 60
+
+
+class NoticeSnapshot:
+    """특정 버전의 공지 목록 (최신순 정렬)과 최신 공지 한 건"""
+
+    def __init__(self, version, df):
+        self.version = version
+        self.df = df
+        self.latest = df.iloc[0].to_dict() if not df.empty else None
+
+
+class NoticeCache:
+    """
+    공지사항을 프로세스 메모리에 정렬된 상태로 보관하는 공유 캐시.
+    공지는 한 달에 몇 번 바뀌는 정도이므로 리런마다 시트를 읽지 않고,
+    공지 관리 화면의 쓰기(등록/수정/삭제)가 있을 때마다 버전을 올려 무효화합니다.
+    """
+
+    def __init__(self, notices_table, max_age=NOTICE_MAX_AGE):
+        self.notices_table = notices_table
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._version = 0
+        self._snapshot = None
+        self._loaded_at = 0
+
+    @property
+    def version(self):
+        with self._lock:
+            return self._version
+
+    def get(self):
+        """현재 버전의 NoticeSnapshot. 무효화 이후 첫 호출에서만 시트를 읽습니다."""
+        with self._lock:
+            if self._fresh():
+                return self._snapshot
+
+        with self._load_lock:
+            # 락을 기다리는 동안 다른 세션이 이미 읽었을 수 있음
+            with self._lock:
+                if self._fresh():
+                    return self._snapshot
+                version = self._version
+            df = self.notices_table.latest_first().reindex(columns=NOTICE_COLUMNS)
+            snapshot = NoticeSnapshot(version, df)
+            with self._lock:
+                # 읽는 도중 쓰기가 있었다면 캐시에 넣지 않습니다. (다음 호출에서 다시 읽음)
+                if self._version == version:
+                    self._snapshot = snapshot
+                    self._loaded_at = time.time()
+            return snapshot
+
+    def _fresh(self):
+        return (
+            self._snapshot is not None
+            and self._snapshot.version == self._version
+            and time.time() - self._loaded_at < self.max_age
+        )
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    # --- 쓰기: 성공/실패(충돌 포함)와 관계없이 무효화하여 다음 조회가 최신 내용을 읽도록 함 ---
+    def append(self, row):
+        try:
+            self.notices_table.append(row)
+        finally:
+            self.invalidate()
+
+    def update(self, key, values, expected=None):
+        try:
+            self.notices_table.update(key, values, expected=expected)
+        finally:
+            self.invalidate()
+
+    def delete(self, key, expected=None):
+        try:
+            self.notices_table.delete(key, expected=expected)
+        finally:
+            self.invalidate()
@@ -2,14 +2,18 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from storage import ConflictError, RowNotFoundError
 
-def render_notice_manager(conn):
+CONFLICT_MESSAGE = "⚠️ 다른 관리자가 먼저 이 공지를 수정하거나 삭제했습니다. 새로고침 후 다시 시도해주세요."
+
+def render_notice_manager(notice_cache):
     st.title("📢 공지사항 관리 (Admin)")
     st.markdown("---")
 
     # 1. 데이터 불러오기
     try:
-        notice_df = conn.read(worksheet="Notice", ttl=0)
+        # 최신순으로 정렬된 공유 캐시 (쓰기가 있을 때마다 무효화됨)
+        notice_df = notice_cache.get().df
     except:
         notice_df = pd.DataFrame(columns=['title', 'content', 'created_at'])
 
@@ -22,13 +26,12 @@ def render_notice_manager(conn):
 
         if submit:
             if n_title and n_content:
-                new_n = pd.DataFrame([{
+                # 새 행만 추가 (다른 관리자가 그 사이 등록한 공지를 덮어쓰지 않음)
+                notice_cache.append({
                     "title": n_title,
                     "content": n_content,
                     "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }])
-                updated_df = pd.concat([notice_df, new_n], ignore_index=True)
-                conn.update(worksheet="Notice", data=updated_df)
+                })
                 st.success("✅ 공지사항이 성공적으로 등록되었습니다.")
                 st.rerun()
             else:
@@ -42,9 +45,6 @@ def render_notice_manager(conn):
     if notice_df.empty:
         st.info("현재 등록된 공지사항이 없습니다.")
     else:
-        # 최신순 정렬
-        notice_df = notice_df.sort_values(by="created_at", ascending=False)
-
         for idx, row in notice_df.iterrows():
             edit_mode_key = f"edit_mode_{idx}"
 
@@ -68,10 +68,16 @@ def render_notice_manager(conn):
 
                 with col_del:
                     if st.button("🗑️ 삭제", key=f"btn_del_{idx}"):
-                        updated_df = notice_df.drop(idx)
-                        conn.update(worksheet="Notice", data=updated_df)
-                        st.toast("🗑️ 삭제 완료")
-                        st.rerun()
+                        try:
+                            # 화면에 보이던 내용과 같을 때만 삭제
+                            notice_cache.delete(
+                                row['created_at'],
+                                expected={'title': row['title'], 'content': row['content']}
+                            )
+                            st.toast("🗑️ 삭제 완료")
+                            st.rerun()
+                        except (ConflictError, RowNotFoundError):
+                            st.error(CONFLICT_MESSAGE)
 
             # --- 수정 모드일 때 (폼 화면으로 전환) ---
             else:
@@ -83,13 +89,19 @@ def render_notice_manager(conn):
                     btn_col1, btn_col2 = st.columns([1, 1])
                     with btn_col1:
                         if st.form_submit_button("💾 저장"):
-                            # 인덱스를 사용하여 정확한 행 수정
-                            notice_df.at[idx, 'title'] = new_title
-                            notice_df.at[idx, 'content'] = new_content
-                            conn.update(worksheet="Notice", data=notice_df)
-                            st.session_state[edit_mode_key] = False
-                            st.success("✅ 수정 완료")
-                            st.rerun()
+                            # 작성 시각(키)으로 해당 행만 수정, 편집을 시작할 때의 내용과 다르면 충돌
+                            try:
+                                notice_cache.update(
+                                    row['created_at'],
+                                    {'title': new_title, 'content': new_content},
+                                    expected={'title': row['title'], 'content': row['content']}
+                                )
+                                st.session_state[edit_mode_key] = False
+                                st.success("✅ 수정 완료")
+                                st.rerun()
+                            except (ConflictError, RowNotFoundError):
+                                st.session_state[edit_mode_key] = False
+                                st.error(CONFLICT_MESSAGE)
                     with btn_col2:
                         if st.form_submit_button("취소"):
                             st.session_state[edit_mode_key] = False
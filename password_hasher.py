@@ -0,0 +1,131 @@
+# password_hasher.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+# bcrypt 작업 계수 (2^rounds 반복). 저장된 해시의 계수가 이와 다르면 로그인 성공 시 다시 해시합니다.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+# 해시 전용 작업 스레드 수와, 동시에 대기할 수 있는 최대 작업 수 (초과 시 AuthBusyError)
+AUTH_WORKERS = int(os.environ.get("AUTH_WORKERS", min(4, os.cpu_count() or 1)))
+AUTH_QUEUE_MAX = AUTH_WORKERS * 4
+# 계정별 로그인 제한: LOGIN_WINDOW초 안에 LOGIN_MAX_FAILURES번 틀리면 LOGIN_LOCKOUT초 동안 시도 차단
+LOGIN_MAX_FAILURES = 5
+LOGIN_WINDOW = 5 * 60
+LOGIN_LOCKOUT = 5 * 60
+
+
+class AuthBusyError(Exception):
+    """해시 작업 대기열이 가득 찼을 때 (로그인 폭주)"""
+    pass
+
+
+def bcrypt_cost(hashed):
+    """'$2b$12$...' 형식 해시의 작업 계수. 형식이 아니면 None"""
+    try:
+        return int(str(hashed).split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+# --- 작업 스레드에서 실행되는 함수 ---
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _verify_password(password, hashed, rounds):
+    """(일치 여부, 작업 계수가 달라 새로 만든 해시 또는 None)"""
+    try:
+        ok = bcrypt.checkpw(password.encode("utf-8"), str(hashed).encode("utf-8"))
+    except ValueError:
+        # 해시 형식이 아닌 값(빈 칸 등)은 불일치로 처리
+        return False, None
+    if ok and bcrypt_cost(hashed) != rounds:
+        return True, _hash_password(password, rounds)
+    return ok, None
+
+
+class PasswordHasher:
+    """
+    bcrypt 해시/검증을 전용 작업 풀에서 실행합니다.
+    bcrypt는 해시 계산 중 GIL을 놓으므로 작업 스레드만으로도 여러 코어를 사용하고 다른 세션의 스크립트를 막지 않습니다.
+    (Streamlit에서는 앱 스크립트가 __main__이라 프로세스 풀을 spawn하면 자식마다 앱 스크립트가 다시 실행됩니다.)
+    동시에 처리하는 작업 수는 max_workers, 대기 작업 수는 queue_max로 제한해 로그인 폭주 시 바로 거절합니다.
+    """
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, max_workers=AUTH_WORKERS, queue_max=AUTH_QUEUE_MAX):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(queue_max)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise AuthBusyError("인증 요청이 많아 잠시 후 다시 시도해주세요.")
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(_hash_password, password, self.rounds)
+
+    def verify(self, password, hashed):
+        """
+        (일치 여부, 새 해시 또는 None).
+        저장된 해시의 작업 계수가 현재 설정과 다르면 같은 작업 안에서 새 해시를 만들어 돌려줍니다.
+        """
+        return self._run(_verify_password, password, hashed, self.rounds)
+
+
+class LoginThrottle:
+    """
+    계정별 로그인 시도 제한.
+    같은 계정은 한 번에 하나의 검증만 진행하고, 연속으로 틀리면 잠시 시도를 막아
+    한 계정에 대한 대량 시도가 해시 작업 풀을 모두 차지하지 못하게 합니다.
+    """
+
+    def __init__(self, max_failures=LOGIN_MAX_FAILURES, window=LOGIN_WINDOW, lockout=LOGIN_LOCKOUT):
+        self.max_failures = max_failures
+        self.window = window
+        self.lockout = lockout
+        self._lock = threading.Lock()
+        self._failures = {}      # {username: [실패 시각, ...]}
+        self._locked_until = {}  # {username: 차단 해제 시각}
+        self._inflight = set()
+
+    def acquire(self, username):
+        """시도할 수 있으면 0, 아니면 다시 시도할 때까지 기다릴 초(1 이상)를 반환합니다."""
+        now = time.time()
+        with self._lock:
+            wait = self._locked_until.get(username, 0) - now
+            if wait > 0:
+                return int(wait) + 1
+            if username in self._inflight:
+                return 1
+            self._inflight.add(username)
+            return 0
+
+    def release(self, username, success=None):
+        """success가 None이면(검증하지 못함) 진행 중 표시만 해제하고 실패 횟수는 그대로 둡니다."""
+        now = time.time()
+        with self._lock:
+            self._inflight.discard(username)
+            if success is None:
+                return
+            if success:
+                self._failures.pop(username, None)
+                self._locked_until.pop(username, None)
+                return
+            failures = [t for t in self._failures.get(username, []) if now - t < self.window]
+            failures.append(now)
+            if len(failures) >= self.max_failures:
+                self._locked_until[username] = now + self.lockout
+                failures = []
+            self._failures[username] = failures
+
+
+# 프로세스 전체에서 공유하는 해시 작업 풀과 로그인 제한
+password_hasher = PasswordHasher()
+login_throttle = LoginThrottle()
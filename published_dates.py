@@ -0,0 +1,157 @@
+# published_dates.py
+import re
+import threading
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+import pandas as pd
+
+# 저장/정렬은 UTC, 화면 표시는 한국 시간
+DISPLAY_TZ = "Asia/Seoul"
+# 저장소(SQLite)에 쓰는 UTC 문자열 형식
+STORE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# 시간대 표기가 없는 발행일을 해석할 시장별 기준 시간대
+MARKET_TZ = {"KOREA": "Asia/Seoul", "USA": "UTC"}
+
+# RFC 822 시간대 약어와 UTC 오프셋 (pandas의 %Z는 EDT 같은 약어를 해석하지 못함)
+NAMED_TZ_OFFSETS = {
+    "UT": "+0000", "UTC": "+0000", "GMT": "+0000", "Z": "+0000",
+    "EST": "-0500", "EDT": "-0400", "CST": "-0600", "CDT": "-0500",
+    "MST": "-0700", "MDT": "-0600", "PST": "-0800", "PDT": "-0700",
+}
+_NAMED_TZ_RE = re.compile(r"\b(" + "|".join(NAMED_TZ_OFFSETS) + r")$")
+# 시간대 약어를 오프셋으로 바꾼 뒤 RFC 822 형식으로 파싱하는 형식 이름
+RFC822_NAMED_TZ = "RFC822_NAMED_TZ"
+# 어떤 형식에도 맞지 않아 한 건씩 파싱해야 했던 언론사 (다음 수집 때 형식 고르기를 건너뜀)
+PER_ROW = ("PER_ROW", True)
+
+# 언론사별로 시도해 볼 발행일 형식 (형식, 시간대 포함 여부)
+CANDIDATE_FORMATS = [
+    ("%a, %d %b %Y %H:%M:%S %z", True),   # RFC 822: Mon, 06 Oct 2025 10:00:00 +0900
+    ("%a, %d %b %Y %H:%M:%S %Z", True),   # RFC 822: Mon, 06 Oct 2025 01:00:00 GMT
+    (RFC822_NAMED_TZ, True),               # RFC 822: Mon, 06 Oct 2025 10:00:00 EDT
+    ("%d %b %Y %H:%M:%S %z", True),
+    ("ISO8601", True),                     # 2025-10-06T10:00:00+09:00 / ...Z
+    ("%Y-%m-%d %H:%M:%S", False),
+    ("%Y-%m-%dT%H:%M:%S", False),
+    ("%Y.%m.%d %H:%M", False),
+]
+_TZ_SUFFIX_RE = re.compile(r"(?:Z|[+-]\d{2}:?\d{2})$")
+# 형식을 고를 때 확인하는 표본 수
+SAMPLE_SIZE = 5
+
+
+def _apply_format(values, fmt, has_tz, naive_tz):
+    """한 형식으로 열 전체를 한 번에 파싱합니다. (맞지 않는 값은 NaT)"""
+    if fmt == RFC822_NAMED_TZ:
+        values = values.str.strip().str.replace(_NAMED_TZ_RE, lambda m: NAMED_TZ_OFFSETS[m[1]], regex=True)
+        fmt = "%a, %d %b %Y %H:%M:%S %z"
+    if has_tz:
+        return pd.to_datetime(values, format=fmt, utc=True, errors="coerce")
+    parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+    return parsed.dt.tz_localize(naive_tz, ambiguous="NaT", nonexistent="NaT").dt.tz_convert("UTC")
+
+
+def _parse_one(value, naive_tz):
+    """형식이 제각각인 나머지 값만 한 건씩 파싱합니다. (EDT 같은 약어 시간대 포함)"""
+    if isinstance(value, datetime):
+        ts = pd.Timestamp(value)
+    else:
+        text = str(value).strip()
+        try:
+            ts = pd.Timestamp(parsedate_to_datetime(text))
+        except Exception:
+            try:
+                ts = pd.Timestamp(text)
+            except Exception:
+                return pd.NaT
+    if ts.tzinfo is None:
+        return ts.tz_localize(naive_tz).tz_convert("UTC")
+    return ts.tz_convert("UTC")
+
+
+class PublishedDateParser:
+    """
+    언론사별 발행일 형식을 처음 한 번 표본으로 알아내 기억해 두고,
+    이후에는 그 형식으로 열 전체를 벡터화하여 파싱합니다. 결과는 항상 UTC 기준 tz-aware 입니다.
+    어떤 형식에도 맞지 않아 한 건씩 파싱한 언론사도 그 결과(PER_ROW)를 기억해 다음에는 바로 한 건씩 파싱합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._formats = {}  # {source: (형식, 시간대 포함 여부)}
+
+    def _learn(self, values):
+        """표본을 가장 많이 파싱하는 형식을 고릅니다. (하나도 맞지 않으면 None)"""
+        sample = values.head(SAMPLE_SIZE).astype(str)
+        best, best_count = None, 0
+        for fmt, has_tz in CANDIDATE_FORMATS:
+            if fmt == "ISO8601":
+                # 시간대가 없는 ISO 문자열은 UTC로 해석되므로 시간대가 붙은 값만 대상으로 합니다.
+                count = _apply_format(sample[sample.str.contains(_TZ_SUFFIX_RE)], fmt, has_tz, "UTC").notna().sum()
+            else:
+                count = _apply_format(sample, fmt, has_tz, "UTC").notna().sum()
+            if count > best_count:
+                best, best_count = (fmt, has_tz), count
+        return best
+
+    def parse(self, source, values, naive_tz="UTC"):
+        """values(문자열/datetime 목록)를 UTC tz-aware Series로 변환합니다. (실패 시 NaT)"""
+        s = values.reset_index(drop=True) if isinstance(values, pd.Series) else pd.Series(list(values), dtype="object")
+        if pd.api.types.is_datetime64_any_dtype(s):
+            return s.dt.tz_localize(naive_tz).dt.tz_convert("UTC") if s.dt.tz is None else s.dt.tz_convert("UTC")
+
+        s = s.astype("object")
+        if pd.api.types.infer_dtype(s, skipna=True) == "datetime" and all(v.tzinfo for v in s.dropna()):
+            # 이미 시간대가 있는 datetime 객체(네이버 결과를 저장할 때 등)는 변환만 합니다.
+            return pd.to_datetime(s, utc=True)
+        result = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns, UTC]")
+        todo = s.notna() & (s.astype(str).str.strip() != "")
+        with self._lock:
+            learned = self._formats.get(source)
+
+        # 1) 기억해 둔 형식  2) 남은 값으로 다시 고른 형식(형식이 바뀐 경우)  3) 한 건씩
+        for attempt in range(2):
+            if not todo.any() or learned == PER_ROW:
+                break
+            fmt = learned if attempt == 0 else None
+            if fmt is None:
+                fmt = self._learn(s[todo])
+                if fmt is None:
+                    break
+                # 처음 보는 언론사이거나, 기억해 둔 형식이 대부분 맞지 않을 때(형식 변경)만 교체합니다.
+                if learned is None or todo.mean() > 0.5:
+                    learned = fmt
+                    with self._lock:
+                        self._formats[source] = fmt
+            values_todo = s[todo].astype(str)
+            if fmt[0] == "ISO8601":
+                values_todo = values_todo[values_todo.str.contains(_TZ_SUFFIX_RE)]
+            result[values_todo.index] = _apply_format(values_todo, fmt[0], fmt[1], naive_tz)
+            todo &= result.isna()
+
+        if todo.any():
+            result[todo] = [_parse_one(v, naive_tz) for v in s[todo]]
+            parsed_most = result[todo].notna().mean() > 0.5
+            with self._lock:
+                # 맞는 형식을 찾지 못했지만 한 건씩은 대부분 파싱된 언론사는 그 방법을 기억하고,
+                # 한 건씩으로도 파싱되지 않게 바뀌었다면 다음 수집 때 형식을 다시 고릅니다.
+                if learned is None and parsed_most:
+                    self._formats.setdefault(source, PER_ROW)
+                elif learned == PER_ROW and not parsed_most:
+                    self._formats.pop(source, None)
+        return result
+
+
+def to_display(published):
+    """UTC 발행일 열을 화면 표시용 한국 시간으로 변환합니다."""
+    return pd.to_datetime(published, utc=True).dt.tz_convert(DISPLAY_TZ)
+
+
+def to_store_strings(published):
+    """UTC 발행일 열을 저장소용 문자열 목록으로 변환합니다. (NaT는 None)"""
+    text = published.dt.strftime(STORE_FORMAT).astype("object")
+    return text.where(published.notna(), None).tolist()
+
+
+# 프로세스 전체에서 공유하는 언론사별 형식 캐시
+date_parser = PublishedDateParser()
@@ -2,17 +2,18 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from storage import ConflictError, RowNotFoundError
 
-def render_qna_page(conn):
+def render_qna_page(storage, notice_cache):
     st.title("✉️ 1:1 문의 게시판")
     st.markdown("---")
 
     # --- [공통] 공지사항 불러오기 섹션 ---
     try:
-        notice_df = conn.read(worksheet="Notice", ttl=0)
+        notice_df = notice_cache.get().df
         if not notice_df.empty:
             st.subheader("📢 공지사항")
-            for _, n_row in notice_df.sort_values(by="created_at", ascending=False).iterrows():
+            for _, n_row in notice_df.iterrows():
                 with st.expander(f"📌 {n_row['title']} ({n_row['created_at']})"):
                     st.write(n_row['content'])
             st.markdown("---")
@@ -22,16 +23,13 @@ def render_qna_page(conn):
     # 기본 컬럼 정의
     required_columns = ['username', 'question', 'answer', 'status', 'created_at', 'replied_at']
 
-    # QnA 데이터 불러오기
-    try:
-        df = conn.read(worksheet="QnA", ttl=0)
-
-        # 만약 시트가 비어있거나 헤더가 없어서 데이터프레임이 제대로 안 만들어졌을 경우
-        if df.empty or 'username' not in df.columns:
-            df = pd.DataFrame(columns=required_columns)
-    except:
-        # 시트 자체를 못 읽어올 경우
-        df = pd.DataFrame(columns=required_columns)
+    def load_qna(query, *args):
+        """화면에 필요한 문의만 조회합니다. (비어 있거나 읽지 못하면 컬럼만 있는 빈 데이터프레임)"""
+        try:
+            return query(*args)
+        except:
+            # 시트 자체를 못 읽어올 경우
+            return pd.DataFrame(columns=required_columns)
 
     # 현재 접속 유저 정보
     curr_user = st.session_state.username
@@ -44,16 +42,14 @@ def render_qna_page(conn):
             user_question = st.text_area("문의하실 내용을 입력해주세요.")
             if st.form_submit_button("질문 등록"):
                 if user_question.strip():
-                    new_q = pd.DataFrame([{
+                    storage.qna.append({
                         "username": curr_user,
                         "question": user_question,
                         "answer": "",
                         "status": "답변대기",
                         "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                         "replied_at": ""
-                    }])
-                    updated_df = pd.concat([df, new_q], ignore_index=True)
-                    conn.update(worksheet="QnA", data=updated_df)
+                    })
                     st.success("질문이 등록되었습니다. 관리자가 확인 후 답변드립니다.")
                     st.rerun()
                 else:
@@ -61,7 +57,7 @@ def render_qna_page(conn):
 
         st.markdown("---")
         st.subheader("내 문의 내역")
-        my_qna = df[df['username'] == curr_user].sort_values(by="created_at", ascending=False)
+        my_qna = load_qna(storage.qna.for_user, curr_user)
 
         if my_qna.empty:
             st.info("등록된 문의가 없습니다.")
@@ -80,12 +76,14 @@ def render_qna_page(conn):
     else:
         # --- [어드민 화면] ---
         st.subheader("📥 들어온 문의 목록")
-        pending_qna = df[df['status'] == "답변대기"]
+        pending_qna = load_qna(storage.qna.by_status, "답변대기")
 
         if pending_qna.empty:
             st.success("새로운 문의가 없습니다!")
         else:
-            for idx, row in pending_qna.iterrows():
+            for _, row in pending_qna.iterrows():
+                # 위젯 키는 문의 키(작성자+작성일)로 만들어 목록이 바뀌어도 입력 중인 답변이 섞이지 않게 합니다.
+                idx = f"{row['username']}_{row['created_at']}"
                 with st.container():
                     st.write(f"**작성자:** {row['username']} | **작성일:** {row['created_at']}")
                     st.write(f"**질문:** {row['question']}")
@@ -94,15 +92,23 @@ def render_qna_page(conn):
                         admin_answer = st.text_area("답변 내용을 입력하세요", key=f"ans_{idx}")
                         if st.button("답변 저장", key=f"btn_{idx}"):
                             if admin_answer.strip():
-                                # 원본 데이터프레임 인덱스 찾아서 수정
-                                df.loc[idx, 'answer'] = admin_answer
-                                df.loc[idx, 'status'] = "답변완료"
-                                df.loc[idx, 'replied_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                conn.update(worksheet="QnA", data=df)
-                                st.success("답변이 등록되었습니다.")
-                                st.rerun()
+                                # 작성자+작성일(키)로 해당 문의만 수정, 다른 관리자가 먼저 답변했다면 충돌
+                                try:
+                                    storage.qna.update(
+                                        {'username': row['username'], 'created_at': row['created_at']},
+                                        {
+                                            'answer': admin_answer,
+                                            'status': "답변완료",
+                                            'replied_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                                        },
+                                        expected={'status': "답변대기"}
+                                    )
+                                    st.success("답변이 등록되었습니다.")
+                                    st.rerun()
+                                except (ConflictError, RowNotFoundError):
+                                    st.error("⚠️ 다른 관리자가 먼저 답변했거나 삭제된 문의입니다. 새로고침 후 확인해주세요.")
                     st.markdown("---")
 
         if st.checkbox("답변 완료된 내역 보기"):
-            completed_qna = df[df['status'] == "답변완료"]
+            completed_qna = load_qna(storage.qna.by_status, "답변완료")
             st.table(completed_qna[['username', 'question', 'answer', 'replied_at']])
\ No newline at end of file
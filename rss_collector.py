@@ -1,10 +1,13 @@
 import feedparser
 import pandas as pd
-from datetime import datetime
+from collections import OrderedDict
+import threading
 import requests
-import re
 import streamlit as st
 import toml
+from feed_cache import feed_cache
+from naver_client import NaverNewsClient, NaverQuotaExceeded
+from published_dates import MARKET_TZ, date_parser
 
 # --- 뉴스 출처를 언론사별로 세분화하여 관리 ---
 SOURCES = {
@@ -25,8 +28,21 @@ SOURCES = {
     }
 }
 
+# --- 병렬 수집 설정 ---
+# (연결 타임아웃, 읽기 타임아웃) 초 단위. 느린 피드 하나가 전체 수집을 붙잡지 않도록 제한합니다.
+FEED_TIMEOUT = (3, 7)
+# 한 번에 동시에 요청할 최대 피드 수 (NewsIngestor가 모든 언론사를 한 번에 요청)
+FEED_MAX_WORKERS = 12
+FEED_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; ai-news-summary/1.0)"}
+
 # --- 1. 네이버 뉴스 검색 (국내) ---
-def fetch_naver_news(query="증시"):
+@st.cache_resource
+def get_naver_client(client_id, client_secret):
+    """프로세스 전체가 공유하는 네이버 검색 클라이언트 (커넥션 풀/결과 캐시/호출 한도 공유)"""
+    return NaverNewsClient(client_id, client_secret)
+
+def fetch_naver_news(query="증시", page=1, sort="date", display=15):
+    """반환: (기사 DataFrame, 네이버가 알려준 전체 결과 수). 실패하면 화면에 이유를 표시하고 빈 결과"""
     # 2. 방어적 로직: secrets에서 안전하게 키 가져오기
     try:
         # st.secrets.get()을 사용하면 키가 없을 때 None을 반환하여 에러를 막을 수 있습니다.
@@ -35,85 +51,113 @@ def fetch_naver_news(query="증시"):
 
         if not NAVER_ID or not NAVER_SECRET:
             st.error("API 키가 설정되지 않았습니다. .streamlit/secrets.toml을 확인하세요.")
-            return pd.DataFrame()
+            return pd.DataFrame(), 0
 
     except Exception as e:
         st.error(f"Secrets 로드 중 오류: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(), 0
 
-    url = "https://openapi.naver.com/v1/search/news.json"
-    headers = {"X-Naver-Client-Id": NAVER_ID, "X-Naver-Client-Secret": NAVER_SECRET}
-    refined_query = f"{query} +(증권|공시|주가|주식)"
-    params = {"query": query, "display": 15, "sort": "date"}
     try:
-        res = requests.get(url, headers=headers, params=params)
-        if res.status_code == 200:
-            print(f"✅ Naver API 호출 성공: {query}")
-            items = res.json().get('items', [])
-            data = []
-            for item in items:
-                data.append({
-                    'title': re.sub('<[^<]+?>', '', item['title']),
-                    'link': item['link'],
-                    'published': datetime.strptime(item['pubDate'], '%a, %d %b %Y %H:%M:%S +0900'),
-                    'summary': re.sub('<[^<]+?>', '', item['description'])
-                })
-            return pd.DataFrame(data)
-        else:
-            print(f"❌ Naver API 오류: {res.status_code} - {res.text}")
-            return pd.DataFrame()
+        items, total = get_naver_client(NAVER_ID, NAVER_SECRET).search(query, sort=sort, page=page, display=display)
+        print(f"✅ Naver 검색 완료: {query} (page={page}, {len(items)}/{total}건)")
+        df = pd.DataFrame(items)
+        if not df.empty:
+            # pubDate(RFC 822, +0900)를 한 번에 UTC로 변환
+            df['published'] = date_parser.parse("KOREA:네이버", df['published'], naive_tz=MARKET_TZ["KOREA"]).set_axis(df.index)
+        return df, total
+    except NaverQuotaExceeded as e:
+        print(f"❌ {e}")
+        st.warning(f"{e} 오늘은 이미 수집된 뉴스에서만 검색합니다.")
+        return pd.DataFrame(), 0
     except Exception as e:
         print(f"⚠️ Naver API 연결 실패: {e}")
-        return pd.DataFrame()
+        st.warning("네이버 뉴스 검색에 실패하여 이미 수집된 뉴스에서만 검색합니다.")
+        return pd.DataFrame(), 0
+
+# --- 2. RSS 피드 단건 수집 (타임아웃 적용) ---
+def fetch_single_feed(url):
+    """
+    피드 하나를 타임아웃을 걸어 내려받고 기사 목록(dict 리스트)을 반환합니다.
+    이전 응답의 ETag / Last-Modified로 조건부 요청을 보내고, 304면 캐시된 기사를 재사용합니다.
+    실패 시 캐시된 기사(없으면 빈 리스트)를 반환하여 다른 피드 수집에 영향을 주지 않습니다.
+    """
+    cached = feed_cache.get(url)
+    headers = {**FEED_HEADERS, **feed_cache.conditional_headers(url)}
+    try:
+        res = requests.get(url, headers=headers, timeout=FEED_TIMEOUT)
+        if res.status_code == 304 and cached:
+            return cached["entries"]
+        res.raise_for_status()
+        feed = feedparser.parse(res.content)
+    except Exception as e:
+        print(f"⚠️ RSS 수집 실패: {url} - {e}")
+        return cached["entries"] if cached else []
+
+    articles = []
+    for entry in feed.entries:
+        articles.append({
+            'title': getattr(entry, 'title', 'No Title'),
+            # 링크가 없는 항목은 GUID로 대신 식별합니다.
+            'link': getattr(entry, 'link', None) or getattr(entry, 'id', '#'),
+            'published': getattr(entry, 'published', None),
+            'summary': getattr(entry, 'summary', 'No Summary')
+        })
+    feed_cache.put(url, res.headers.get("ETag"), res.headers.get("Last-Modified"), articles)
+    return articles
 
-def fetch_rss_feeds(market_type="KOREA", source_name=None):
+# --- 3. 증분 수집: 이전에 본 기사는 건너뛰고 새 기사만 처리 ---
+# 언론사별로 기억해 둘 기사 ID(링크/GUID) 수
+SEEN_MAX = 2000
+
+class FeedDiffer:
     """
-    market_type: "KOREA" 또는 "USA"
-    source_name: 특정 언론사 선택 (None일 경우 해당 시장 전체 수집)
+    언론사별로 이미 저장한 기사 ID를 기억하고, 새 기사만 골라냅니다.
+    diff()는 고르기만 하고, 저장에 성공한 뒤 mark_seen()으로 등록해야
+    저장 실패(DB 잠금 등) 시 같은 기사가 다음 수집에서 다시 처리됩니다.
     """
-    market_data = SOURCES.get(market_type, SOURCES["KOREA"])
-
-    if source_name:
-        rss_urls = [market_data.get(source_name)]
-    else:
-        rss_urls = list(market_data.values())
-
-    all_articles = []
-
-    for url in rss_urls:
-        if not url: continue
-        feed = feedparser.parse(url)
-        if not feed.entries:
-            continue
-
-        try:
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                dt = datetime(*entry.published_parsed[:6])
-                published = dt + timedelta(hours=9)
-            else:
-                published = datetime.now()
-        except Exception:
-            published = datetime.now()
-
-        for entry in feed.entries:
-            title = getattr(entry, 'title', 'No Title')
-            link = getattr(entry, 'link', '#')
-            published_str = getattr(entry, 'published', None)
-            summary = getattr(entry, 'summary', 'No Summary')
-
-            all_articles.append({
-                'title': title,
-                'link': link,
-                'published': published_str,
-                'summary': summary
-            })
-
-    if not all_articles:
-        return pd.DataFrame(columns=['title', 'link', 'published', 'summary'])
-
-    df = pd.DataFrame(all_articles)
-    # 날짜 정렬을 위해 datetime 형식 확정
-    df['published'] = pd.to_datetime(df['published'])
-    # 최신순 정렬
-    df = df.sort_values(by='published', ascending=False).reset_index(drop=True)
-    return df
\ No newline at end of file
+
+    def __init__(self, seen_max=SEEN_MAX):
+        self.seen_max = seen_max
+        self._lock = threading.Lock()
+        self._seen = {}      # {key: OrderedDict[id -> None]}
+
+    def seed(self, key, ids):
+        """재시작 시 저장소에 이미 있는 기사 ID를 미리 등록합니다."""
+        self.mark_seen(key, ids)
+
+    def is_seeded(self, key):
+        with self._lock:
+            return key in self._seen
+
+    def diff(self, key, articles):
+        """처음 보는 기사만 반환합니다. (피드 안의 중복 링크는 하나로)"""
+        new_articles = []
+        with self._lock:
+            seen = self._seen.get(key, {})
+            picked = set()
+            for article in articles:
+                article_id = article.get('link')
+                if not article_id or article_id in seen or article_id in picked:
+                    continue
+                picked.add(article_id)
+                new_articles.append(article)
+        return new_articles
+
+    def mark_seen(self, key, ids):
+        """저장을 마친 기사 ID를 등록합니다. 오래된 ID부터 seen_max개를 넘는 만큼 잊습니다."""
+        with self._lock:
+            seen = self._seen.setdefault(key, OrderedDict())
+            for article_id in ids:
+                seen[article_id] = None
+            while len(seen) > self.seen_max:
+                seen.popitem(last=False)
+
+# 프로세스 전체에서 공유하는 증분 수집 상태
+feed_differ = FeedDiffer()
+
+def fetch_new_entries(market_type, source_name):
+    """언론사 하나를 수집하여 처음 보는 기사만 반환합니다. (저장 후 feed_differ.mark_seen 필요)"""
+    url = SOURCES.get(market_type, {}).get(source_name)
+    if not url:
+        return []
+    return feed_differ.diff((market_type, source_name), fetch_single_feed(url))
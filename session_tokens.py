@@ -0,0 +1,122 @@
+# session_tokens.py
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from feed_cache import CACHE_DIR
+
+# 자동 로그인 토큰 유효기간 (초)
+SESSION_TOKEN_TTL = 7 * 24 * 60 * 60
+REVOKED_TOKENS_PATH = os.path.join(CACHE_DIR, "revoked_tokens.json")
+SECRET_FALLBACK_PATH = os.path.join(CACHE_DIR, "session_secret")
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def load_secret(configured=None):
+    """
+    서명용 서버 비밀키. secrets.toml / 환경변수의 SESSION_SECRET을 사용하고,
+    없으면 로컬 파일에 한 번 생성해 두고 재사용합니다. (재시작해도 기존 토큰 유지)
+    """
+    secret = configured or os.environ.get("SESSION_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    try:
+        with open(SECRET_FALLBACK_PATH, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    print("⚠️ SESSION_SECRET이 설정되지 않아 로컬 비밀키를 생성합니다.")
+    os.makedirs(os.path.dirname(SECRET_FALLBACK_PATH) or ".", exist_ok=True)
+    secret = secrets.token_bytes(32)
+    try:
+        # 소유자만 읽을 수 있게(0o600) 새로 만듭니다. 다른 프로세스가 먼저 만들었다면 그 키를 사용합니다.
+        fd = os.open(SECRET_FALLBACK_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(SECRET_FALLBACK_PATH, "rb") as f:
+            return f.read()
+    with os.fdopen(fd, "wb") as f:
+        f.write(secret)
+    return secret
+
+
+class RevocationList:
+    """
+    로그아웃된 토큰 ID(jti)와 만료 시각만 보관하는 작은 목록.
+    만료된 토큰은 어차피 검증에 실패하므로 목록에서 정리됩니다.
+    """
+
+    def __init__(self, path=REVOKED_TOKENS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._revoked = json.load(f)
+        except Exception:
+            self._revoked = {}
+
+    def revoke(self, jti, exp):
+        with self._lock:
+            now = time.time()
+            self._revoked = {k: v for k, v in self._revoked.items() if v > now}
+            self._revoked[jti] = exp
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._revoked, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"⚠️ 토큰 폐기 목록 저장 실패: {e}")
+
+    def is_revoked(self, jti):
+        with self._lock:
+            return jti in self._revoked
+
+
+class SessionTokenSigner:
+    """
+    HMAC-SHA256으로 서명된 자동 로그인 토큰 (아이디/권한/만료시각 포함).
+    저장소를 조회하지 않고 서명과 만료만 확인하므로 검증은 CPU 연산만으로 끝납니다.
+    """
+
+    def __init__(self, secret, revocations=None, ttl=SESSION_TOKEN_TTL):
+        self.secret = secret
+        self.revocations = revocations or RevocationList()
+        self.ttl = ttl
+
+    def _sign(self, payload):
+        return _b64encode(hmac.new(self.secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, username, role):
+        claims = {"u": username, "r": role, "exp": int(time.time()) + self.ttl, "jti": secrets.token_urlsafe(12)}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token):
+        """유효한 토큰이면 claims(dict), 아니면 None"""
+        try:
+            payload, signature = token.split(".", 1)
+            if not hmac.compare_digest(signature, self._sign(payload)):
+                return None
+            claims = json.loads(_b64decode(payload))
+        except Exception:
+            return None
+        if claims.get("exp", 0) < time.time() or self.revocations.is_revoked(claims.get("jti")):
+            return None
+        return claims
+
+    def revoke(self, token):
+        claims = self.verify(token)
+        if claims:
+            self.revocations.revoke(claims["jti"], claims["exp"])
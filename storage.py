@@ -0,0 +1,523 @@
+# storage.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+import pandas as pd
+from feed_cache import CACHE_DIR
+
+# --- 테이블 정의: 컬럼 목록과 행을 식별하는 키 컬럼 ---
+TABLES = {
+    "Users": {
+        "columns": ['username', 'hashed_password', 'openai_api_key', 'gemini_api_key',
+                    'session_token', 'created_at', 'role', 'last_login'],
+        "key": ['username'],
+    },
+    "Visitors": {
+        "columns": ['date', 'count'],
+        "key": ['date'],
+    },
+    "Notice": {
+        "columns": ['title', 'content', 'created_at'],
+        "key": ['created_at'],
+    },
+    "QnA": {
+        "columns": ['username', 'question', 'answer', 'status', 'created_at', 'replied_at'],
+        "key": ['username', 'created_at'],
+    },
+}
+
+STORAGE_DB_PATH = os.path.join(CACHE_DIR, "app.db")
+
+
+class StorageError(Exception):
+    """저장소 구조 문제 등으로 요청한 쓰기를 처리할 수 없을 때"""
+    pass
+
+
+class RowNotFoundError(StorageError):
+    pass
+
+
+class ConflictError(StorageError):
+    """행을 읽은 뒤 다른 사용자가 먼저 수정/삭제하여 기대한 값과 달라졌을 때 (낙관적 동시성 제어)"""
+    pass
+
+
+def _cell_str(value):
+    """시트 셀 문자열과 비교하기 위한 정규화 (None/NaN -> '', 3.0 -> '3')"""
+    if value is None:
+        return ""
+    try:
+        if pd.isna(value):
+            return ""
+    except (TypeError, ValueError):
+        pass
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _check_expected(current, expected):
+    """current(dict)의 값이 expected(dict)와 모두 같은지 확인합니다."""
+    for col, value in (expected or {}).items():
+        if _cell_str(current.get(col)) != _cell_str(value):
+            raise ConflictError(f"'{col}' 값이 변경되었습니다.")
+
+
+# ---------------------------------------------------------
+# 저장소 어댑터 (Backend): 테이블 단위 읽기/쓰기
+# ---------------------------------------------------------
+class SheetsBackend:
+    """
+    Google Sheets 어댑터.
+    테이블 전체 읽기/교체는 기존과 동일하게 GSheetsConnection을 사용하고,
+    행 단위 쓰기는 gspread 워크시트의 범위(range) 업데이트로 바뀐 행만 전송합니다.
+
+    시트에는 트랜잭션이 없으므로 충돌 감지(expected)는 최선 노력(best-effort)입니다.
+    쓰기 직전에 행을 다시 읽어 키와 기대값을 확인하지만, 그 확인과 쓰기 사이에
+    다른 사용자가 같은 행을 바꾸거나 행을 지우는 경우까지 막지는 못합니다.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._worksheets = {}
+
+    def read(self, table):
+        return self.conn.read(worksheet=table, ttl=0)
+
+    def write(self, table, df):
+        self.conn.update(worksheet=table, data=df)
+
+    def select(self, table, where=None, order_by=None, descending=False):
+        """시트는 조건 조회를 지원하지 않으므로 전체를 읽은 뒤 메모리에서 거르고 정렬합니다."""
+        df = self.read(table)
+        if df is None or df.empty:
+            return df
+        for col, value in (where or {}).items():
+            if col not in df.columns:
+                return df.iloc[0:0]
+            df = df[df[col].map(_cell_str) == _cell_str(value)]
+        if order_by and order_by in df.columns:
+            df = df.sort_values(by=order_by, ascending=not descending)
+        return df
+
+    # --- 행 단위 쓰기 ---
+    def _worksheet(self, table):
+        if table not in self._worksheets:
+            # GSheetsConnection은 gspread 워크시트를 공개 API로 노출하지 않아 내부 메서드를 사용합니다.
+            select = getattr(self.conn.client, "_select_worksheet", None)
+            if select is None:
+                raise StorageError("이 버전의 GSheetsConnection은 행 단위 쓰기를 지원하지 않습니다.")
+            self._worksheets[table] = select(worksheet=table)
+        return self._worksheets[table]
+
+    @staticmethod
+    def _header(ws, table, key_columns, columns=(), create=False):
+        """
+        1행(헤더)을 읽고, columns 중 시트에 없는 컬럼은 헤더 끝에 추가합니다. (키 컬럼이 없으면 StorageError)
+        헤더가 없는 빈 시트는 []를 반환하고, create=True면 테이블 정의 컬럼으로 헤더를 먼저 씁니다.
+        """
+        header = ws.row_values(1)
+        if not header:
+            if not create:
+                return header
+            defined = TABLES[table]["columns"] if table in TABLES else []
+            header = list(dict.fromkeys(list(defined) + list(columns)))
+            if ws.col_count < len(header):
+                ws.add_cols(len(header) - ws.col_count)
+            ws.update(range_name=f"A1:{_column_letter(len(header))}1", values=[header], value_input_option="RAW")
+            print(f"✅ {table} 시트에 헤더 생성: {header}")
+            return header
+        missing_keys = [col for col in key_columns if col not in header]
+        if missing_keys:
+            raise StorageError(f"{table} 시트에 키 컬럼이 없습니다: {missing_keys}")
+        missing = [col for col in dict.fromkeys(columns) if col not in header]
+        if missing:
+            header = header + missing
+            if ws.col_count < len(header):
+                ws.add_cols(len(header) - ws.col_count)
+            ws.update(
+                range_name=f"{_column_letter(len(header) - len(missing) + 1)}1:{_column_letter(len(header))}1",
+                values=[missing],
+                value_input_option="RAW"
+            )
+            print(f"✅ {table} 시트에 컬럼 추가: {missing}")
+        return header
+
+    @staticmethod
+    def _row_numbers(ws, header, key_columns):
+        """키 컬럼만 읽어 {키 값 튜플: 행 번호(1부터, 헤더 포함)}를 만듭니다."""
+        key_cols = [ws.col_values(header.index(col) + 1) for col in key_columns]
+        rows = {}
+        for i, values in enumerate(zip(*key_cols)):
+            if i > 0:
+                rows.setdefault(tuple(values), i + 1)
+        return rows
+
+    def _find_row(self, table, key, columns=()):
+        ws = self._worksheet(table)
+        header = self._header(ws, table, list(key), columns)
+        if not header:
+            raise RowNotFoundError(f"{table}: {key}")
+        rows = self._row_numbers(ws, header, list(key))
+        row_num = rows.get(tuple(_cell_str(v) for v in key.values()))
+        if row_num is None:
+            raise RowNotFoundError(f"{table}: {key}")
+        return ws, header, row_num
+
+    @staticmethod
+    def _read_row(ws, header, row_num):
+        values = ws.row_values(row_num)
+        return dict(zip(header, values + [""] * (len(header) - len(values))))
+
+    @staticmethod
+    def _key_columns(table):
+        return TABLES[table]["key"] if table in TABLES else []
+
+    @staticmethod
+    def _row_range(header, row_num):
+        last_col = _column_letter(len(header))
+        return f"A{row_num}:{last_col}{row_num}"
+
+    def get_row(self, table, key):
+        try:
+            ws, header, row_num = self._find_row(table, key)
+        except RowNotFoundError:
+            return None
+        return self._read_row(ws, header, row_num)
+
+    def append_row(self, table, row):
+        ws = self._worksheet(table)
+        # 시트에 없는 컬럼(이전 스키마로 만든 시트의 last_login 등)은 헤더에 추가하고,
+        # 새로 만든 빈 시트라면 헤더부터 쓴 뒤 첫 행을 추가합니다.
+        header = self._header(ws, table, self._key_columns(table), list(row), create=True)
+        ws.append_row([_cell_str(row.get(col)) for col in header], value_input_option="RAW")
+
+    def update_row(self, table, key, values, expected=None):
+        ws, header, row_num = self._find_row(table, key, list(values) + list(expected or {}))
+        # 쓰기 직전에 행을 다시 읽어, 행이 밀렸거나 다른 사용자가 값을 바꿨다면 충돌로 처리합니다.
+        current = self._read_row(ws, header, row_num)
+        _check_expected(current, {**key, **(expected or {})})
+        current.update(values)
+        ws.update(
+            range_name=self._row_range(header, row_num),
+            values=[[_cell_str(current.get(col)) for col in header]],
+            value_input_option="RAW"
+        )
+
+    def update_rows(self, table, updates):
+        """
+        여러 행의 일부 셀을 API 한 번(batch_update)으로 수정합니다. (기대값 확인 없음)
+        updates: [(key dict, values dict)], 반환값: 찾지 못한 키 목록
+        """
+        if not updates:
+            return []
+        ws = self._worksheet(table)
+        key_columns = list(updates[0][0])
+        header = self._header(ws, table, key_columns, [col for _, values in updates for col in values])
+        if not header:
+            return [key for key, _ in updates]
+        rows = self._row_numbers(ws, header, key_columns)
+        targets, missing = [], []
+        for key, values in updates:
+            row_num = rows.get(tuple(_cell_str(v) for v in key.values()))
+            if row_num is None:
+                missing.append(key)
+            else:
+                targets.append((key, values, row_num))
+
+        # 쓰기 직전에 대상 행의 키 셀을 다시 읽어, 그 사이 행이 밀린 경우 한 번 더 찾습니다.
+        key_ranges = [
+            f"{_column_letter(header.index(col) + 1)}{row_num}"
+            for _, _, row_num in targets for col in key_columns
+        ]
+        if key_ranges:
+            expected_keys = [_cell_str(key[col]) for key, _, _ in targets for col in key_columns]
+            fresh_keys = [cell[0][0] if cell and cell[0] else "" for cell in ws.batch_get(key_ranges)]
+            if fresh_keys != expected_keys:
+                rows = self._row_numbers(ws, header, key_columns)
+                retargeted = []
+                for key, values, _ in targets:
+                    row_num = rows.get(tuple(_cell_str(v) for v in key.values()))
+                    if row_num is None:
+                        missing.append(key)
+                    else:
+                        retargeted.append((key, values, row_num))
+                targets = retargeted
+
+        data = [
+            {"range": f"{_column_letter(header.index(col) + 1)}{row_num}", "values": [[_cell_str(value)]]}
+            for _, values, row_num in targets for col, value in values.items()
+        ]
+        if data:
+            ws.batch_update(data, value_input_option="RAW")
+        return missing
+
+    def delete_row(self, table, key, expected=None):
+        ws, header, row_num = self._find_row(table, key)
+        # 삭제 직전에 행을 다시 읽어 키와 기대값이 그대로인지 확인합니다.
+        _check_expected(self._read_row(ws, header, row_num), {**key, **(expected or {})})
+        ws.delete_rows(row_num)
+
+
+def _column_letter(index):
+    """1 -> A, 27 -> AA"""
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+class SQLiteBackend:
+    """
+    로컬 SQLite 어댑터. 테이블별 색인과 트랜잭션을 사용하며,
+    구글 시트 없이(오프라인/테스트/벤치마크) 같은 코드로 앱을 실행할 수 있습니다.
+    """
+
+    INDEXES = {
+        "Users": ["CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON \"Users\" (username)"],
+        "Visitors": ["CREATE UNIQUE INDEX IF NOT EXISTS idx_visitors_date ON \"Visitors\" (date)"],
+        "Notice": ["CREATE INDEX IF NOT EXISTS idx_notice_created ON \"Notice\" (created_at)"],
+        "QnA": [
+            "CREATE INDEX IF NOT EXISTS idx_qna_user ON \"QnA\" (username, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_qna_status ON \"QnA\" (status)",
+        ],
+    }
+
+    def __init__(self, path=STORAGE_DB_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for table, spec in TABLES.items():
+                columns = ", ".join(f'"{col}" {"INTEGER" if col == "count" else "TEXT"}' for col in spec["columns"])
+                conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({columns})')
+                for sql in self.INDEXES.get(table, []):
+                    conn.execute(sql)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def read(self, table):
+        columns = TABLES[table]["columns"]
+        col_sql = ", ".join(f'"{col}"' for col in columns)
+        with self._connect() as conn:
+            rows = conn.execute(f'SELECT {col_sql} FROM "{table}" ORDER BY rowid').fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def select(self, table, where=None, order_by=None, descending=False):
+        """조건(컬럼 = 값)과 정렬을 SQL로 처리하여 테이블별 색인을 사용합니다."""
+        columns = TABLES[table]["columns"]
+        if order_by is not None and order_by not in columns:
+            raise StorageError(f"{table}: 알 수 없는 정렬 컬럼 {order_by}")
+        col_sql = ", ".join(f'"{col}"' for col in columns)
+        sql, params = f'SELECT {col_sql} FROM "{table}"', []
+        if where:
+            where_sql, params = self._where(where)
+            sql += f" WHERE {where_sql}"
+        sql += f' ORDER BY "{order_by}" {"DESC" if descending else "ASC"}' if order_by else " ORDER BY rowid"
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def write(self, table, df):
+        columns = TABLES[table]["columns"]
+        data = df.reindex(columns=columns)
+        data = data.astype(object).where(pd.notna(data), None)
+        rows = [tuple(_to_sql_value(v) for v in row) for row in data.itertuples(index=False)]
+        col_sql = ", ".join(f'"{col}"' for col in columns)
+        placeholders = ", ".join("?" * len(columns))
+        # 전체 교체는 하나의 트랜잭션으로 처리 (중간에 실패하면 이전 상태 유지)
+        with self._write_lock, self._connect() as conn:
+            conn.execute(f'DELETE FROM "{table}"')
+            conn.executemany(f'INSERT INTO "{table}" ({col_sql}) VALUES ({placeholders})', rows)
+
+    # --- 행 단위 쓰기 (키 컬럼 색인 사용, 트랜잭션 안에서 확인 후 수정) ---
+    @staticmethod
+    def _where(key):
+        return " AND ".join(f'"{col}" = ?' for col in key), [_to_sql_value(v) for v in key.values()]
+
+    def _select_row(self, conn, table, key):
+        columns = TABLES[table]["columns"]
+        where, params = self._where(key)
+        col_sql = ", ".join(f'"{col}"' for col in columns)
+        row = conn.execute(f'SELECT {col_sql} FROM "{table}" WHERE {where} LIMIT 1', params).fetchone()
+        return dict(zip(columns, row)) if row else None
+
+    def get_row(self, table, key):
+        with self._connect() as conn:
+            return self._select_row(conn, table, key)
+
+    def append_row(self, table, row):
+        columns = TABLES[table]["columns"]
+        col_sql = ", ".join(f'"{col}"' for col in columns)
+        placeholders = ", ".join("?" * len(columns))
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                f'INSERT INTO "{table}" ({col_sql}) VALUES ({placeholders})',
+                [_to_sql_value(row.get(col)) for col in columns]
+            )
+
+    def update_row(self, table, key, values, expected=None):
+        with self._write_lock, self._connect() as conn:
+            # 다른 프로세스가 확인과 수정 사이에 끼어들지 못하도록 쓰기 잠금을 먼저 잡습니다.
+            conn.execute("BEGIN IMMEDIATE")
+            current = self._select_row(conn, table, key)
+            if current is None:
+                raise RowNotFoundError(f"{table}: {key}")
+            _check_expected(current, expected)
+            set_sql = ", ".join(f'"{col}" = ?' for col in values)
+            where, params = self._where(key)
+            conn.execute(
+                f'UPDATE "{table}" SET {set_sql} WHERE {where}',
+                [_to_sql_value(v) for v in values.values()] + params
+            )
+
+    def update_rows(self, table, updates):
+        """여러 행을 한 트랜잭션으로 수정합니다. 반환값: 찾지 못한 키 목록"""
+        missing = []
+        with self._write_lock, self._connect() as conn:
+            for key, values in updates:
+                set_sql = ", ".join(f'"{col}" = ?' for col in values)
+                where, params = self._where(key)
+                cursor = conn.execute(
+                    f'UPDATE "{table}" SET {set_sql} WHERE {where}',
+                    [_to_sql_value(v) for v in values.values()] + params
+                )
+                if cursor.rowcount == 0:
+                    missing.append(key)
+        return missing
+
+    def delete_row(self, table, key, expected=None):
+        with self._write_lock, self._connect() as conn:
+            # 다른 프로세스가 확인과 수정 사이에 끼어들지 못하도록 쓰기 잠금을 먼저 잡습니다.
+            conn.execute("BEGIN IMMEDIATE")
+            current = self._select_row(conn, table, key)
+            if current is None:
+                raise RowNotFoundError(f"{table}: {key}")
+            _check_expected(current, expected)
+            where, params = self._where(key)
+            conn.execute(f'DELETE FROM "{table}" WHERE {where}', params)
+
+
+def _to_sql_value(value):
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat(sep=" ") if isinstance(value, pd.Timestamp) else value.isoformat()
+    return str(value)
+
+
+# ---------------------------------------------------------
+# 테이블별 저장소 (Repository): 페이지 모듈은 이 인터페이스만 사용합니다.
+# ---------------------------------------------------------
+class TableRepository:
+    table = None
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.columns = TABLES[self.table]["columns"]
+        self.key = TABLES[self.table]["key"]
+
+    def all(self):
+        """테이블 전체. 비어 있거나 헤더가 없으면 컬럼만 있는 빈 DataFrame을 반환합니다."""
+        return self._frame(self.backend.read(self.table))
+
+    def find(self, where=None, order_by=None, descending=False):
+        """where(컬럼: 값)에 맞는 행만 order_by 순서로 반환합니다. (SQLite는 색인 사용)"""
+        return self._frame(self.backend.select(self.table, where, order_by, descending))
+
+    def _frame(self, df):
+        if df is None or df.empty or self.key[0] not in df.columns:
+            return pd.DataFrame(columns=self.columns)
+        return df
+
+    def replace(self, df):
+        self.backend.write(self.table, df)
+
+    # --- 행 단위 쓰기: 바뀐 행만 전송 ---
+    def row_key(self, key):
+        """단일 키 테이블은 값만 넘겨도 되도록 {컬럼: 값} 형태로 맞춥니다."""
+        if not isinstance(key, dict):
+            key = {self.key[0]: key}
+        return {col: key[col] for col in self.key}
+
+    def get(self, key):
+        return self.backend.get_row(self.table, self.row_key(key))
+
+    def append(self, row):
+        self.backend.append_row(self.table, row)
+
+    def update(self, key, values, expected=None):
+        """
+        key로 찾은 행의 values 컬럼만 수정합니다.
+        expected를 주면 현재 값이 그와 다를 때 ConflictError를 발생시킵니다. (다른 사용자의 수정 감지)
+        """
+        self.backend.update_row(self.table, self.row_key(key), values, expected)
+
+    def delete(self, key, expected=None):
+        self.backend.delete_row(self.table, self.row_key(key), expected)
+
+    def update_many(self, updates):
+        """[(key, values)]를 한 번에 반영합니다. 찾지 못한 키 목록을 반환합니다."""
+        return self.backend.update_rows(self.table, [(self.row_key(key), values) for key, values in updates])
+
+
+class UsersTable(TableRepository):
+    table = "Users"
+
+
+class VisitorsTable(TableRepository):
+    table = "Visitors"
+
+
+class NoticeTable(TableRepository):
+    table = "Notice"
+
+    def latest_first(self):
+        return self.find(order_by="created_at", descending=True)
+
+
+class QnATable(TableRepository):
+    table = "QnA"
+
+    def for_user(self, username):
+        """사용자 한 명의 문의 (최신순, idx_qna_user 색인)"""
+        return self.find({'username': username}, order_by="created_at", descending=True)
+
+    def by_status(self, status):
+        """상태별 문의 (등록순, idx_qna_status 색인)"""
+        return self.find({'status': status})
+
+
+class Storage:
+    """앱에서 사용하는 네 개 테이블의 저장소 묶음"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.users = UsersTable(backend)
+        self.visitors = VisitorsTable(backend)
+        self.notices = NoticeTable(backend)
+        self.qna = QnATable(backend)
+
+
+def create_storage(backend_name, conn_factory=None, path=STORAGE_DB_PATH):
+    """
+    backend_name: "gsheets"(기본) 또는 "sqlite"
+    conn_factory: gsheets 사용 시 GSheetsConnection을 만드는 함수 (sqlite에서는 호출하지 않음)
+    """
+    if backend_name == "sqlite":
+        return Storage(SQLiteBackend(path))
+    return Storage(SheetsBackend(conn_factory()))
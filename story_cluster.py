@@ -0,0 +1,122 @@
+# story_cluster.py
+import hashlib
+import re
+
+# SimHash 비트 수와 LSH 밴드 구성 (16비트 x 4밴드)
+SIMHASH_BITS = 64
+LSH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // LSH_BANDS
+# 해밍 거리가 이 값 이하이면 같은 기사(스토리)로 봅니다.
+# 밴드가 4개이므로 거리 3 이하인 쌍은 적어도 한 밴드가 반드시 일치합니다.
+NEAR_DUP_DISTANCE = 3
+# 발행 시각이 이 범위(초) 안에 있는 기사끼리만 묶습니다. (매일 반복되는 시황 제목 방지)
+CLUSTER_WINDOW = 48 * 60 * 60
+
+_TAG_RE = re.compile(r"<[^<]+?>")
+# [속보], (종합), 【단독】 같은 말머리 제거
+_PREFIX_RE = re.compile(r"[\[\(【<][^\]\)】>]{0,10}[\]\)】>]")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def normalize_text(text):
+    text = _TAG_RE.sub("", text or "")
+    text = _PREFIX_RE.sub(" ", text)
+    text = _NON_WORD_RE.sub(" ", text.lower())
+    return " ".join(text.split())
+
+
+def _shingles(text, size=3):
+    compact = text.replace(" ", "")
+    if len(compact) <= size:
+        return [compact] if compact else []
+    return [compact[i:i + size] for i in range(len(compact) - size + 1)]
+
+
+def simhash(text):
+    """정규화된 제목의 글자 3-gram으로 64비트 SimHash를 계산합니다. (한글에도 형태소 분석 없이 동작)"""
+    weights = [0] * SIMHASH_BITS
+    for shingle in _shingles(normalize_text(text)):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def bands(value):
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (i * BAND_BITS)) & mask for i in range(LSH_BANDS)]
+
+
+def to_signed(value):
+    """SQLite INTEGER(부호 있는 64비트)에 저장하기 위한 변환"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+class StoryClusterer:
+    """
+    언론사가 달라도 같은 내용의 기사를 하나의 스토리(cluster)로 묶습니다.
+    - 링크가 같은 기사는 저장 단계(PRIMARY KEY)에서 이미 하나로 합쳐집니다.
+    - 제목의 SimHash를 LSH 밴드로 색인하여, 전체 기사와 비교하지 않고
+      밴드가 일치하는 후보만 비교합니다. (기사 수가 늘어도 비교 대상은 거의 늘지 않음)
+    cluster_id는 스토리에 처음 저장된 기사의 rowid입니다.
+    """
+
+    @staticmethod
+    def create_tables(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS story_bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                simhash INTEGER NOT NULL,
+                cluster_id INTEGER NOT NULL,
+                published TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_story_bands ON story_bands (band, value)")
+
+    def assign(self, conn, rowids):
+        """새로 저장된 기사(rowid 목록)에 cluster_id를 부여합니다."""
+        for rowid in rowids:
+            row = conn.execute(
+                "SELECT title, COALESCE(published, datetime(fetched_at, 'unixepoch')) FROM articles WHERE rowid = ?",
+                (rowid,)
+            ).fetchone()
+            if row is None:
+                continue
+            title, published = row
+            value = simhash(title)
+            cluster_id = self._find_cluster(conn, value, published) or rowid
+
+            conn.execute("UPDATE articles SET cluster_id = ? WHERE rowid = ?", (cluster_id, rowid))
+            conn.executemany(
+                "INSERT INTO story_bands (band, value, simhash, cluster_id, published) VALUES (?, ?, ?, ?, ?)",
+                [(i, band, to_signed(value), cluster_id, published) for i, band in enumerate(bands(value))]
+            )
+
+    def _find_cluster(self, conn, value, published):
+        clauses = " OR ".join("(band = ? AND value = ?)" for _ in range(LSH_BANDS))
+        params = [p for i, band in enumerate(bands(value)) for p in (i, band)]
+        candidates = conn.execute(
+            f"SELECT DISTINCT simhash, cluster_id FROM story_bands WHERE ({clauses}) "
+            "AND ABS(strftime('%s', published) - strftime('%s', ?)) <= ?",
+            params + [published, CLUSTER_WINDOW]
+        ).fetchall()
+
+        best_id, best_distance = None, NEAR_DUP_DISTANCE + 1
+        for stored, cluster_id in candidates:
+            distance = hamming(value, to_unsigned(stored))
+            if distance < best_distance:
+                best_id, best_distance = cluster_id, distance
+        return best_id
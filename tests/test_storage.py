@@ -0,0 +1,129 @@
+# tests/test_storage.py
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import TABLES, Storage, SheetsBackend  # noqa: E402
+
+
+def _column_number(letters):
+    number = 0
+    for ch in letters:
+        number = number * 26 + ord(ch) - 64
+    return number
+
+
+class FakeWorksheet:
+    """gspread 워크시트 중 SheetsBackend가 사용하는 메서드만 메모리에서 흉내 냅니다."""
+
+    def __init__(self, rows=None, col_count=26):
+        self.rows = [list(row) for row in rows or []]
+        self.col_count = col_count
+
+    def row_values(self, row_num):
+        values = list(self.rows[row_num - 1]) if row_num <= len(self.rows) else []
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def col_values(self, col_num):
+        values = [row[col_num - 1] if col_num <= len(row) else "" for row in self.rows]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def add_cols(self, count):
+        self.col_count += count
+
+    def _set(self, range_name, values):
+        match = re.match(r"([A-Z]+)(\d+)", range_name)
+        col0, row0 = _column_number(match[1]), int(match[2])
+        for i, row_values in enumerate(values):
+            for j, value in enumerate(row_values):
+                row_num, col_num = row0 + i, col0 + j
+                assert col_num <= self.col_count
+                while len(self.rows) < row_num:
+                    self.rows.append([])
+                row = self.rows[row_num - 1]
+                row.extend([""] * (col_num - len(row)))
+                row[col_num - 1] = value
+
+    def update(self, range_name, values, value_input_option=None):
+        self._set(range_name, values)
+
+    def batch_update(self, data, value_input_option=None):
+        for item in data:
+            self._set(item["range"], item["values"])
+
+    def batch_get(self, ranges):
+        result = []
+        for range_name in ranges:
+            match = re.match(r"([A-Z]+)(\d+)$", range_name)
+            value = self.row_values(int(match[2]))[_column_number(match[1]) - 1:][:1]
+            result.append([value] if value else [])
+        return result
+
+    def append_row(self, values, value_input_option=None):
+        self.rows.append(list(values))
+
+    def delete_rows(self, row_num):
+        del self.rows[row_num - 1]
+
+
+class FakeConnection:
+    def __init__(self, worksheets):
+        self.client = self
+        self.worksheets = worksheets
+
+    def _select_worksheet(self, worksheet):
+        return self.worksheets[worksheet]
+
+
+@pytest.fixture
+def empty_sheets():
+    worksheets = {table: FakeWorksheet() for table in TABLES}
+    return worksheets, Storage(SheetsBackend(FakeConnection(worksheets)))
+
+
+@pytest.mark.parametrize("table, repo_name, row", [
+    ("QnA", "qna", {'username': 'kim', 'question': '질문', 'answer': '', 'status': '답변대기',
+                    'created_at': '2024-01-01 10:00:00', 'replied_at': ''}),
+    ("Notice", "notices", {'title': '공지', 'content': '내용', 'created_at': '2024-01-01 10:00:00'}),
+    ("Users", "users", {'username': 'kim', 'hashed_password': 'hash', 'role': 'user'}),
+    ("Visitors", "visitors", {'date': '2024-01-01', 'count': 1}),
+])
+def test_append_to_empty_sheet_writes_header_first(empty_sheets, table, repo_name, row):
+    worksheets, storage = empty_sheets
+    repo = getattr(storage, repo_name)
+
+    repo.append(row)
+
+    ws = worksheets[table]
+    assert ws.row_values(1) == TABLES[table]["columns"]
+    assert len(ws.rows) == 2
+    assert repo.get(row) == {col: str(row.get(col, "")) for col in TABLES[table]["columns"]}
+
+
+def test_empty_sheet_reads_as_missing_rows(empty_sheets):
+    worksheets, storage = empty_sheets
+
+    assert storage.visitors.get('2024-01-01') is None
+    assert storage.users.update_many([('kim', {'last_login': 'now'})]) == [{'username': 'kim'}]
+    assert worksheets["Users"].rows == []
+
+
+def test_append_adds_missing_columns_to_existing_header(empty_sheets):
+    worksheets, storage = empty_sheets
+    ws = worksheets["Users"]
+    old_columns = [col for col in TABLES["Users"]["columns"] if col != 'last_login']
+    ws.rows = [list(old_columns)]
+    ws.col_count = len(old_columns)
+
+    storage.users.append({'username': 'kim', 'last_login': 'now'})
+
+    assert ws.row_values(1) == old_columns + ['last_login']
+    assert storage.users.get('kim')['last_login'] == 'now'
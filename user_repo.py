@@ -0,0 +1,196 @@
+# user_repo.py
+import threading
+import time
+import pandas as pd
+from storage import TABLES, ConflictError
+
+USER_COLUMNS = TABLES["Users"]["columns"]
+# 시트 변경 사항(관리자가 시트를 직접 수정한 경우 등)을 반영하는 주기 (초)
+USER_REFRESH_INTERVAL = 60
+
+
+def _normalize_users(df):
+    """빈 셀(NaN)을 빈 문자열로 바꾸고 필수 컬럼을 채웁니다."""
+    df = df.copy()
+    for col in USER_COLUMNS:
+        if col not in df.columns:
+            df[col] = 'user' if col == 'role' else ''
+    df = df.astype(object).where(pd.notna(df), '')
+    df['username'] = df['username'].astype(str)
+    return df[df['username'] != '']
+
+
+class UserRepository:
+    """
+    Users 테이블을 메모리에 한 번 읽어 두고, 아이디/세션 토큰 딕셔너리 색인으로 O(1) 조회합니다.
+    - 쓰기는 바뀐 행만 시트에 바로 반영하고, 성공하면 메모리를 갱신 (write-through)
+    - 마지막 로그인 시각 같은 비필수 변경은 write_queue로 지연 반영 (update_deferred)
+    - USER_REFRESH_INTERVAL마다 백그라운드에서 시트를 다시 읽어 바뀐 행만 색인에 반영
+    """
+
+    def __init__(self, users_table, refresh_interval=USER_REFRESH_INTERVAL, write_queue=None):
+        self.users_table = users_table
+        self.refresh_interval = refresh_interval
+        self.write_queue = write_queue
+        self._lock = threading.RLock()
+        self._users = {}      # {username: dict}
+        self._by_token = {}   # {session_token: username}
+        self._columns = list(USER_COLUMNS)
+        self._loaded_at = 0
+        self._write_seq = 0
+        self._refreshing = False
+        self._adding = set()  # 저장 중인 신규 가입 아이디
+        try:
+            self._apply(self._read_sheet())
+        except Exception as e:
+            print(f"⚠️ Users 시트 로드 실패: {e}")
+
+    def _read_sheet(self):
+        return _normalize_users(self.users_table.all())
+
+    def _apply(self, df):
+        """시트 내용과 비교하여 추가/변경/삭제된 사용자만 색인에 반영합니다."""
+        with self._lock:
+            self._columns = list(dict.fromkeys(list(df.columns) + USER_COLUMNS))
+            fresh = {row['username']: row for row in df.to_dict('records')}
+            # 아직 시트에 반영되지 않은 지연 쓰기는 시트 값보다 새로우므로 덮어씁니다.
+            if self.write_queue is not None:
+                for (username,), values in self.write_queue.pending(self.users_table.table).items():
+                    if username in fresh:
+                        fresh[username] = {**fresh[username], **values}
+            for username in list(self._users):
+                if username not in fresh:
+                    self._unindex(username)
+                    del self._users[username]
+            for username, row in fresh.items():
+                if self._users.get(username) != row:
+                    self._unindex(username)
+                    self._users[username] = row
+                    self._index(username)
+            self._loaded_at = time.time()
+
+    def _index(self, username):
+        token = self._users[username].get('session_token')
+        if token:
+            self._by_token[token] = username
+
+    def _unindex(self, username):
+        token = self._users.get(username, {}).get('session_token')
+        if token and self._by_token.get(token) == username:
+            del self._by_token[token]
+
+    def refresh_if_stale(self):
+        """마지막 로드 후 일정 시간이 지났으면 백그라운드에서 다시 읽습니다. (리런을 막지 않음)"""
+        with self._lock:
+            if self._refreshing or time.time() - self._loaded_at < self.refresh_interval:
+                return
+            self._refreshing = True
+            seq = self._write_seq
+        threading.Thread(target=self._refresh, args=(seq,), daemon=True).start()
+
+    def _refresh(self, seq):
+        try:
+            df = self._read_sheet()
+            with self._lock:
+                # 읽는 동안 쓰기가 있었다면 시트 내용이 더 오래된 것일 수 있으므로 버립니다.
+                if self._write_seq == seq:
+                    self._apply(df)
+        except Exception as e:
+            print(f"⚠️ Users 시트 갱신 실패: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    # --- 조회 ---
+    def get(self, username):
+        with self._lock:
+            user = self._users.get(username)
+            return dict(user) if user else None
+
+    def get_by_token(self, token):
+        with self._lock:
+            username = self._by_token.get(token)
+            return self.get(username) if username else None
+
+    def exists(self, username):
+        with self._lock:
+            return username in self._users
+
+    def to_dataframe(self):
+        with self._lock:
+            return pd.DataFrame(list(self._users.values()), columns=self._columns)
+
+    # --- 쓰기 (write-through, 행 단위) ---
+    # 저장소 쓰기(시트 네트워크 호출)는 락 밖에서 하여 그동안 다른 세션의 인증 조회를 막지 않고,
+    # 쓰기가 성공한 뒤에만 락을 잡고 메모리에 반영합니다.
+    def _commit(self, username, fields):
+        with self._lock:
+            self._unindex(username)
+            self._users[username] = {**self._users.get(username, {}), **fields}
+            self._index(username)
+            # 쓰기 전에 시작된 백그라운드 갱신 결과가 이 값을 덮어쓰지 않도록 합니다.
+            self._write_seq += 1
+
+    def add(self, user):
+        with self._lock:
+            row = {col: '' for col in self._columns}
+            row.update(user)
+            username = row['username']
+            # 같은 아이디로 동시에 가입하는 경우 하나만 저장합니다.
+            if username in self._users or username in self._adding:
+                raise ConflictError(f"이미 사용 중인 아이디입니다: {username}")
+            self._adding.add(username)
+        try:
+            self.users_table.append(row)
+            self._commit(username, row)
+        finally:
+            with self._lock:
+                self._adding.discard(username)
+
+    def update(self, username, **fields):
+        """
+        바뀐 컬럼만 시트에 씁니다. 메모리에 있던 이전 값을 기대값으로 넘기므로
+        그 사이 시트에서 값이 바뀌었다면 ConflictError가 발생하고, 다음 요청 때 시트를 다시 읽습니다.
+        """
+        with self._lock:
+            if username not in self._users:
+                raise KeyError(username)
+            current = self._users[username]
+            expected = {col: current.get(col, '') for col in fields}
+        discarded = {}
+        if self.write_queue is not None:
+            # 대기 중인 지연 쓰기가 이 값을 나중에 덮어쓰지 않도록 예약에서 뺍니다. (쓰기 실패 시 되돌림)
+            discarded = self.write_queue.discard(self.users_table, username, fields)
+        try:
+            self.users_table.update(username, fields, expected=expected)
+        except Exception as e:
+            if discarded:
+                self.write_queue.restore(self.users_table, username, discarded)
+            if isinstance(e, ConflictError):
+                with self._lock:
+                    self._loaded_at = 0
+            raise
+        self._commit(username, fields)
+
+    def update_deferred(self, username, **fields):
+        """
+        메모리만 즉시 갱신하고 시트 반영은 write_queue에 맡깁니다. (기대값 확인 없음, 나중 값 우선)
+        write_queue가 없으면 update()와 같이 바로 씁니다.
+        """
+        if self.write_queue is None:
+            return self.update(username, **fields)
+        with self._lock:
+            if username not in self._users:
+                raise KeyError(username)
+            self._unindex(username)
+            self._users[username] = {**self._users[username], **fields}
+            self._index(username)
+            self._write_seq += 1
+            self.write_queue.enqueue(self.users_table, username, fields)
+
+    def replace_all(self, df):
+        """관리자 화면에서 편집한 전체 테이블로 교체합니다."""
+        self.users_table.replace(df)
+        with self._lock:
+            self._write_seq += 1
+            self._apply(_normalize_users(df))
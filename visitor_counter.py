@@ -0,0 +1,79 @@
+# visitor_counter.py
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime
+import pandas as pd
+from storage import ConflictError
+
+# 모아둔 방문 수를 시트에 반영하는 주기(초)와, 주기 전이라도 즉시 반영할 누적 방문 수
+VISITOR_FLUSH_INTERVAL = 60
+VISITOR_FLUSH_THRESHOLD = 20
+# 다른 인스턴스와 같은 날짜 행을 동시에 갱신해 충돌했을 때 다시 읽고 더하는 횟수
+VISITOR_CONFLICT_RETRIES = 3
+
+
+class VisitorCounter:
+    """
+    방문 수를 프로세스 메모리에서 날짜별로 합산해 두었다가 주기적으로 저장소(Visitors)에 반영합니다.
+    세션마다 시트를 읽고 쓰지 않으므로 첫 화면 표시가 시트 I/O를 기다리지 않고,
+    반영은 날짜 행 단위로 (시트 값 + 누적분)을 기대값 확인과 함께 쓰므로 동시 방문에도 카운트가 유실되지 않습니다.
+    """
+
+    def __init__(self, visitors_table, interval=VISITOR_FLUSH_INTERVAL, threshold=VISITOR_FLUSH_THRESHOLD):
+        self.visitors_table = visitors_table
+        self.interval = interval
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._deltas = Counter()
+        self._flush_now = threading.Event()
+        threading.Thread(target=self._run, name="visitor-counter", daemon=True).start()
+        atexit.register(self.flush)
+
+    def hit(self, date=None):
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            self._deltas[date] += 1
+            if sum(self._deltas.values()) >= self.threshold:
+                self._flush_now.set()
+
+    def _run(self):
+        while True:
+            self._flush_now.wait(self.interval)
+            self._flush_now.clear()
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._deltas = self._deltas, Counter()
+            if not deltas:
+                return
+            try:
+                self._merge(deltas)
+            except Exception as e:
+                # 실패한 누적분은 되돌려 다음 반영 때 다시 시도합니다.
+                with self._lock:
+                    self._deltas.update(deltas)
+                print(f"Visitor Tracking Error: {e}")
+
+    def _merge(self, deltas):
+        # 실패한 날짜의 누적분은 예외와 함께 남겨 다음 주기에 재시도합니다. (반영된 날짜는 제외)
+        for date in list(deltas):
+            self._merge_date(date, deltas[date])
+            del deltas[date]
+
+    def _merge_date(self, date, delta):
+        for attempt in range(VISITOR_CONFLICT_RETRIES):
+            row = self.visitors_table.get(date)
+            try:
+                if row is None:
+                    self.visitors_table.append({'date': date, 'count': delta})
+                else:
+                    count = int(pd.to_numeric(row.get('count'), errors='coerce') or 0)
+                    self.visitors_table.update(date, {'count': count + delta}, expected={'count': row.get('count')})
+                return
+            except ConflictError:
+                if attempt == VISITOR_CONFLICT_RETRIES - 1:
+                    raise
@@ -0,0 +1,138 @@
+# write_behind.py
+import atexit
+import threading
+
+# 모아둔 변경을 저장소에 반영하는 주기(초)와, 주기 전이라도 즉시 반영할 대기 행 수
+WRITE_BEHIND_INTERVAL = 5
+WRITE_BEHIND_BATCH_SIZE = 50
+# 반영 실패 시 다음 주기에 다시 시도하는 최대 횟수 (초과하면 버리고 로그만 남김)
+WRITE_BEHIND_MAX_ATTEMPTS = 5
+
+
+class WriteBehindQueue:
+    """
+    마지막 로그인 시각처럼 즉시 저장될 필요가 없는 행 수정을 모아 두었다가 백그라운드에서 반영합니다.
+    - 같은 행에 대한 여러 번의 수정은 하나로 합침 (나중 값 우선)
+    - WRITE_BEHIND_INTERVAL마다 테이블별로 묶어 한 번에 반영 (update_many)
+    - 실패한 변경은 다시 대기열에 넣어 재시도, 종료 시(atexit) 남은 변경을 모두 반영
+    """
+
+    def __init__(self, interval=WRITE_BEHIND_INTERVAL, batch_size=WRITE_BEHIND_BATCH_SIZE,
+                 max_attempts=WRITE_BEHIND_MAX_ATTEMPTS):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # {(테이블 이름, 키 튜플): {"repo", "key", "values", "attempts"}}
+        self._pending = {}
+        self._inflight = {}
+        self._flush_now = threading.Event()
+        self._stopped = False
+        threading.Thread(target=self._run, name="write-behind", daemon=True).start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def _slot(repo, key):
+        key = repo.row_key(key)
+        return (repo.table, tuple(key.values())), key
+
+    def enqueue(self, repo, key, values):
+        """repo(TableRepository)의 key 행에 values를 나중에 반영하도록 예약합니다."""
+        slot, key = self._slot(repo, key)
+        with self._lock:
+            entry = self._pending.setdefault(slot, {"repo": repo, "key": key, "values": {}, "attempts": 0})
+            entry["values"].update(values)
+            if len(self._pending) >= self.batch_size:
+                self._flush_now.set()
+
+    def discard(self, repo, key, columns):
+        """
+        동기 쓰기로 저장할 컬럼은 예약에서 빼서 오래된 값이 나중에 덮어쓰지 않게 합니다.
+        반환값: 뺀 값 {컬럼: 값}. 동기 쓰기가 실패하면 restore()로 되돌립니다.
+        """
+        slot, _ = self._slot(repo, key)
+        removed = {}
+        # 반영 중인 묶음이 동기 쓰기 뒤에 도착하지 않도록 진행 중인 flush가 끝나길 기다립니다.
+        with self._flush_lock, self._lock:
+            entry = self._pending.get(slot)
+            if entry:
+                for col in columns:
+                    if col in entry["values"]:
+                        removed[col] = entry["values"].pop(col)
+                if not entry["values"]:
+                    del self._pending[slot]
+        return removed
+
+    def restore(self, repo, key, values):
+        """discard()로 뺀 값을 다시 예약합니다. 그 사이 새로 예약된 컬럼은 새 값을 유지합니다."""
+        if not values:
+            return
+        slot, key = self._slot(repo, key)
+        with self._lock:
+            entry = self._pending.setdefault(slot, {"repo": repo, "key": key, "values": {}, "attempts": 0})
+            entry["values"] = {**values, **entry["values"]}
+
+    def pending(self, table):
+        """아직 저장소에 반영되지 않은 변경 {키 튜플: values} (반영 중인 것 포함)"""
+        result = {}
+        with self._lock:
+            for source in (self._inflight, self._pending):
+                for (name, key), entry in source.items():
+                    if name == table:
+                        result.setdefault(key, {}).update(entry["values"])
+        return result
+
+    def _run(self):
+        while not self._stopped:
+            self._flush_now.wait(self.interval)
+            self._flush_now.clear()
+            self.flush()
+
+    def flush(self):
+        """대기 중인 변경을 테이블별로 묶어 반영합니다. 실패한 변경은 다시 대기열로 돌아갑니다."""
+        with self._flush_lock:
+            with self._lock:
+                self._inflight, self._pending = self._pending, {}
+                batch = self._inflight
+            if not batch:
+                return
+
+            by_table = {}
+            for slot, entry in batch.items():
+                by_table.setdefault(slot[0], []).append((slot, entry))
+
+            failed = {}
+            for table, entries in by_table.items():
+                repo = entries[0][1]["repo"]
+                try:
+                    missing = repo.update_many([(entry["key"], entry["values"]) for _, entry in entries])
+                    for key in missing:
+                        print(f"⚠️ 지연 쓰기 대상 행 없음 ({table}): {key}")
+                except Exception as e:
+                    print(f"⚠️ 지연 쓰기 실패 ({table}, {len(entries)}건): {e}")
+                    for slot, entry in entries:
+                        entry["attempts"] += 1
+                        if entry["attempts"] >= self.max_attempts:
+                            print(f"❌ 지연 쓰기 포기 ({table}): {entry['key']} {entry['values']}")
+                        else:
+                            failed[slot] = entry
+
+            with self._lock:
+                # 재시도할 변경 위에 그 사이 새로 들어온 변경을 덮어써서 최신 값이 이기도록 합니다.
+                for slot, entry in failed.items():
+                    newer = self._pending.get(slot)
+                    if newer:
+                        entry["values"].update(newer["values"])
+                    self._pending[slot] = entry
+                self._inflight = {}
+
+    def close(self):
+        """종료 시 남은 변경을 모두 반영합니다. (실패 시 재시도 횟수 안에서 반복)"""
+        self._stopped = True
+        self._flush_now.set()
+        for _ in range(self.max_attempts):
+            self.flush()
+            with self._lock:
+                if not self._pending:
+                    return